@@ -0,0 +1,47 @@
+"""
+Micro-benchmark of reading cell values from a wide author table row,
+comparing a col_names.index() search with the precomputed column positions
+
+Run from the repository root:
+
+    python -m benchmarks.cell_value
+"""
+import timeit
+from ejpcsvparser import csv_data as data
+
+
+def main(number=100000):
+    table_type = "authors"
+    col_names = data.get_csv_col_names(table_type)
+    row = data.get_csv_data_rows(table_type)[0]
+    # read the right-most columns of the row which are the slowest to search for
+    read_col_names = col_names[-10:]
+
+    def read_with_index():
+        for col_name in read_col_names:
+            data.get_cell_value(col_name, col_names, row)
+
+    def read_with_positions():
+        for col_name in read_col_names:
+            data.get_table_cell_value(table_type, col_name, row)
+
+    # positions resolved once before a loop, as the indexing functions do
+    positions = [data.get_col_position(table_type, name) for name in read_col_names]
+
+    def read_with_resolved_positions():
+        for position in positions:
+            data.get_position_value(position, row)
+
+    print("%s columns in %s" % (len(col_names), data.get_csv_path(table_type)))
+    for name, function in [
+        ("col_names.index()", read_with_index),
+        ("column positions", read_with_positions),
+        ("resolved positions", read_with_resolved_positions),
+    ]:
+        seconds = min(timeit.repeat(function, number=number, repeat=5))
+        per_cell = seconds / (number * len(read_col_names)) * 1e9
+        print("%-20s %8.1f ns per cell" % (name, per_cell))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark of convert_to_xml_string() on the abstracts and titles of the test
+CSV files, compared with the baseline conversion which runs every step on
+each string, including those without any tags
+
+Run from the repository root:
+
+    python -m benchmarks.convert_xml_string
+"""
+import timeit
+from elifearticle import utils as eautils
+from elifetools import utils as etoolsutils
+from ejpcsvparser import csv_data as data
+from ejpcsvparser import utils
+
+
+def convert_to_xml_string_baseline(string):
+    "convert_to_xml_string() as it was, applying each step to the whole string"
+    string = utils.entity_to_unicode(string)
+    string = utils.decode_brackets(string)
+    string = eautils.replace_tags(string, "i", "italic")
+    string = eautils.replace_tags(string, "u", "underline")
+    string = eautils.replace_tags(string, "b", "bold")
+    string = eautils.replace_tags(string, "em", "italic")
+    string = etoolsutils.escape_unmatched_angle_brackets(string, utils.allowed_tags())
+    return string
+
+
+def fixture_values(table_type, column_name):
+    position = data.get_col_position(table_type, column_name)
+    return [
+        row[position]
+        for row in data.get_csv_data_rows(table_type)
+        if len(row) > position and row[position].strip()
+    ]
+
+
+def time_per_call(function, values, number):
+    def run():
+        for value in values:
+            function(value)
+
+    seconds = min(timeit.repeat(run, number=number, repeat=5))
+    return seconds / (number * len(values)) * 1e6
+
+
+def main(number=200):
+    values = fixture_values("abstract", "poa_m_abstract_tag") + fixture_values(
+        "title", "poa_m_title_tag"
+    )
+    for name, function in [
+        ("baseline", convert_to_xml_string_baseline),
+        ("convert_to_xml_string()", utils.convert_to_xml_string),
+    ]:
+        print(
+            "%-26s %8.1f us per value over %s values"
+            % (name, time_per_call(function, values, number), len(values))
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark of adding principal award recipients to the funding awards of a
+consortium paper with 500 authors and 50 funders, comparing the nested loop
+over positions, contributors and funding rows with add_principal_award_recipients()
+
+Run from the repository root:
+
+    python -m benchmarks.funding_recipients
+"""
+import random
+import timeit
+from collections import OrderedDict
+from elifearticle import article as ea
+from ejpcsvparser import parse
+
+
+def fixture(author_count=500, funder_count=50, awards_per_author=3, seed=1):
+    "contributors, funding awards and funding table keys for one manuscript"
+    article_id = "99999"
+    random.seed(seed)
+    contributors = []
+    for index in range(author_count):
+        contrib = ea.Contributor("author", "Surname%s" % index, "Given")
+        contrib.auth_id = str(10000 + index)
+        contributors.append(contrib)
+    funder_ids = []
+    for contrib in contributors:
+        for position in random.sample(range(1, funder_count + 1), awards_per_author):
+            funder_ids.append((article_id, contrib.auth_id, str(position)))
+    return contributors, funder_ids
+
+
+def new_funding_awards(funder_ids):
+    funding_awards = OrderedDict()
+    for (_, _, funder_position) in funder_ids:
+        funding_awards[funder_position] = ea.FundingAward()
+    return funding_awards
+
+
+def nested_loops(funding_awards, contributors, funder_ids):
+    "the previous recipient matching, looping over every combination"
+    for position in sorted(funding_awards.keys()):
+        for contrib in contributors:
+            for (_, author_id, funder_position) in funder_ids:
+                if position == funder_position and contrib.auth_id == author_id:
+                    funding_awards[position].add_principal_award_recipient(contrib)
+
+
+def main(number=3):
+    contributors, funder_ids = fixture()
+    print(
+        "%s contributors, %s funding rows, %s funding awards"
+        % (len(contributors), len(funder_ids), len(new_funding_awards(funder_ids)))
+    )
+    for name, function in [
+        ("nested loops", nested_loops),
+        ("add_principal_award_recipients()", parse.add_principal_award_recipients),
+    ]:
+        seconds = min(
+            timeit.repeat(
+                lambda: function(
+                    new_funding_awards(funder_ids), contributors, funder_ids
+                ),
+                number=number,
+                repeat=3,
+            )
+        )
+        print("%-34s %10.2f ms" % (name, seconds / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
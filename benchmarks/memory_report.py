@@ -0,0 +1,136 @@
+"""
+Memory report of loading the author and funding tables of a synthetic full
+export, 20000 manuscripts with 8 authors and 3 funding rows each, comparing
+the memory held by the loaded tables with and without INTERNED_COLUMNS, and
+when read from a memory map with MMAP_TABLES, whose mapped file pages are
+not counted because they are in the OS page cache
+
+Run from the repository root:
+
+    python -m benchmarks.memory_report
+"""
+import csv
+import os
+import random
+import shutil
+import tempfile
+import tracemalloc
+from ejpcsvparser import csv_data as data
+
+
+COUNTRIES = ["Country %s" % index for index in range(200)]
+ORGANIZATIONS = ["University %s" % index for index in range(800)]
+DEPARTMENTS = ["Department of Subject %s" % index for index in range(300)]
+FUNDERS = ["Funder %s" % index for index in range(500)]
+
+
+def write_table(path, query, col_names, rows):
+    with open(path, "w", newline="") as open_file:
+        open_file.write('"Query: %s"\n"Generated on October 2, 2014"\n\n' % query)
+        writer = csv.writer(open_file, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        writer.writerow(col_names)
+        writer.writerows(rows)
+
+
+def author_row(col_names, article_id, author_id, seq):
+    values = {
+        "poa_m_ms_id": str(article_id + 1000),
+        "poa_m_ms_no": str(article_id),
+        "poa_a_id": str(author_id),
+        "poa_a_seq": str(seq),
+        "poa_a_type_cde": random.choice(["Contributing Author", "Corresponding Author"]),
+        "poa_a_dual_corr": " ",
+        "poa_a_last_nm": "Surname%s" % author_id,
+        "poa_a_first_nm": "Given%s" % author_id,
+        "poa_a_organization": random.choice(ORGANIZATIONS),
+        "poa_a_department": random.choice(DEPARTMENTS),
+        "poa_a_city": "City %s" % random.randrange(1000),
+        "poa_a_country": random.choice(COUNTRIES),
+        "poa_a_email": "author%s@example.org" % author_id,
+    }
+    return [values.get(col_name, " ") for col_name in col_names]
+
+
+def write_export(csv_path, article_count=20000, authors=8, funders=3, seed=1):
+    "write the synthetic author and funding tables to csv_path"
+    random.seed(seed)
+    author_col_names = data.get_csv_col_names("authors")
+    author_rows = []
+    funding_rows = []
+    for article_id in range(1, article_count + 1):
+        for seq in range(1, authors + 1):
+            author_id = article_id * 100 + seq
+            author_rows.append(author_row(author_col_names, article_id, author_id, seq))
+        for order in range(1, funders + 1):
+            funding_rows.append(
+                [
+                    str(article_id + 1000),
+                    str(article_id),
+                    str(article_id * 100 + random.randrange(1, authors + 1)),
+                    "GRANT-%s-%s" % (article_id, order),
+                    str(order),
+                    random.choice(FUNDERS),
+                    " ",
+                ]
+            )
+    write_table(
+        os.path.join(csv_path, data.CSV_FILES["authors"]),
+        "POA Author",
+        author_col_names,
+        author_rows,
+    )
+    write_table(
+        os.path.join(csv_path, data.CSV_FILES["funding"]),
+        "POA Funding",
+        data.get_csv_col_names("funding"),
+        funding_rows,
+    )
+
+
+def table_memory(table_type):
+    "bytes of memory held by the loaded table"
+    data.clear_table_caches(table_type)
+    tracemalloc.start()
+    sheet = data.get_csv_sheet(table_type)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sheet
+    data.clear_table_caches(table_type)
+    return size
+
+
+def main():
+    table_types = ["authors", "funding"]
+    csv_path = tempfile.mkdtemp()
+    try:
+        write_export(csv_path)
+        data.clear_table_caches()
+        data.CSV_PATH = csv_path + os.sep
+        for table_type in table_types:
+            rows = len(data.get_csv_data_rows(table_type))
+            data.INTERNED_COLUMNS = []
+            plain = table_memory(table_type)
+            data.INTERNED_COLUMNS = data.settings.INTERNED_COLUMNS
+            interned = table_memory(table_type)
+            data.MMAP_TABLES = [table_type]
+            mapped = table_memory(table_type)
+            data.MMAP_TABLES = []
+            print(
+                "%-8s %7s rows %8.1f MB, %8.1f MB interned, %5.1f%% saved, "
+                "%8.1f MB memory mapped"
+                % (
+                    table_type,
+                    rows,
+                    plain / 1e6,
+                    interned / 1e6,
+                    (plain - interned) * 100.0 / plain,
+                    mapped / 1e6,
+                )
+            )
+    finally:
+        data.clear_table_caches()
+        shutil.rmtree(csv_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark of parsing the ethics and datasets XML from the test CSV files,
+timing parse_ethics() and parse_datasets() and comparing the XML parsing step
+of xml.dom.minidom with xml.etree.ElementTree on the same strings
+
+Run from the repository root:
+
+    python -m benchmarks.parse_xml
+"""
+import timeit
+from xml.dom import minidom
+from xml.etree import ElementTree
+from elifetools import utils as etoolsutils
+from ejpcsvparser import csv_data as data
+from ejpcsvparser import parse, utils
+
+
+def fixture_values(table_type, column_name):
+    position = data.get_col_position(table_type, column_name)
+    return [
+        row[position]
+        for row in data.get_csv_data_rows(table_type)
+        if len(row) > position and row[position].strip()
+    ]
+
+
+def time_per_call(function, values, number):
+    def run():
+        for value in values:
+            function(value)
+
+    seconds = min(timeit.repeat(run, number=number, repeat=5))
+    return seconds / (number * len(values)) * 1e6
+
+
+def main(number=200):
+    ethics = fixture_values("ethics", data.COLUMN_HEADINGS["ethics"])
+    datasets = fixture_values("datasets", data.COLUMN_HEADINGS["datasets"])
+    xml_strings = [
+        etoolsutils.escape_ampersand(utils.unserialise_angle_brackets(value))
+        for value in ethics
+    ] + [
+        etoolsutils.escape_ampersand(
+            utils.unserialise_angle_brackets(utils.escape_angle_brackets(value))
+        )
+        for value in datasets
+    ]
+
+    for name, function, values in [
+        ("parse_ethics()", parse.parse_ethics, ethics),
+        ("parse_datasets()", parse.parse_datasets, datasets),
+        ("minidom.parseString()", minidom.parseString, xml_strings),
+        ("ElementTree.fromstring()", ElementTree.fromstring, xml_strings),
+    ]:
+        print(
+            "%-26s %8.1f us per value over %s values"
+            % (name, time_per_call(function, values, number), len(values))
+        )
+
+
+if __name__ == "__main__":
+    main()
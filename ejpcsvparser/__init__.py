@@ -18,3 +18,20 @@ def configure_logging(filename, level=logging.INFO, format_string=None):
     LOGGER.addHandler(handler)
     LOGGER.setLevel(level)
     return handler
+
+
+class StructuredMessage(object):
+    """
+    log message of an event and its fields as key=value pairs, formatted only
+    when a handler emits it, so logging calls below the logger level are cheap
+    """
+
+    def __init__(self, event, **fields):
+        self.event = event
+        self.fields = fields
+
+    def __str__(self):
+        return " ".join(
+            [self.event]
+            + ["%s=%s" % (key, self.fields[key]) for key in sorted(self.fields)]
+        )
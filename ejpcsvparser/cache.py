@@ -0,0 +1,171 @@
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+from ejpcsvparser import LOGGER
+
+
+# every memoization cache created, so they can be cleared and reported on together
+CACHES = weakref.WeakValueDictionary()
+
+CACHE_IDS = itertools.count()
+
+# entries of each cache keyed on its cache_id, used by the threads which have not
+# swapped in other entries, see swap_entries()
+DEFAULT_ENTRIES = {}
+
+
+class ThreadEntries(threading.local):
+    "the entries each thread has swapped in, DEFAULT_ENTRIES until it swaps"
+
+    entries = DEFAULT_ENTRIES
+
+
+THREAD_ENTRIES = ThreadEntries()
+
+
+class Memodict(object):
+    """
+    Memoization cache, keyed on the function arguments
+
+    maxsize limits the number of entries, discarding the least recently used,
+    table is the table type the entries belong to, either a table type string
+    or the position of the argument holding the table type.
+    The entries are kept in a separate OrderedDict, found by cache_id in the
+    entries used by the current thread, so a thread can swap in a whole set of
+    them, see swap_entries()
+    """
+
+    def __init__(self, value, maxsize=None, table=None):
+        self.value = value
+        self.maxsize = maxsize
+        self.table = table
+        self.cache_id = next(CACHE_IDS)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def entries(self):
+        "the entries of the cache used by the current thread"
+        entries = THREAD_ENTRIES.entries
+        try:
+            return entries[self.cache_id]
+        except KeyError:
+            return entries.setdefault(self.cache_id, OrderedDict())
+
+    def __call__(self, *args):
+        try:
+            # the entries property inlined, as this is called for every lookup
+            entries = THREAD_ENTRIES.entries[self.cache_id]
+        except KeyError:
+            entries = self.entries
+        try:
+            result = entries[args]
+        except KeyError:
+            self.misses += 1
+            result = self.value(*args)
+            entries[args] = result
+            if self.maxsize is not None and len(entries) > self.maxsize:
+                entries.popitem(last=False)
+            return result
+        self.hits += 1
+        if self.maxsize is not None:
+            entries.move_to_end(args)
+        return result
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        return self.entries[key]
+
+    def __setitem__(self, key, value):
+        self.entries[key] = value
+
+    def __delitem__(self, key):
+        del self.entries[key]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def keys(self):
+        return self.entries.keys()
+
+    def clear(self):
+        self.entries.clear()
+
+    def key_table(self, key):
+        "the table type the key belongs to, if known"
+        if isinstance(self.table, int):
+            return key[self.table] if len(key) > self.table else None
+        return self.table
+
+    def clear_table(self, table_type):
+        "remove the entries belonging to the table type"
+        entries = self.entries
+        # other threads using the same entries may add or remove keys meanwhile
+        for key in list(entries):
+            if self.key_table(key) == table_type:
+                entries.pop(key, None)
+
+    def info(self):
+        "hit and miss counts and size of the cache"
+        return OrderedDict(
+            [
+                ("hits", self.hits),
+                ("misses", self.misses),
+                ("size", len(self)),
+                ("maxsize", self.maxsize),
+            ]
+        )
+
+
+def memoize(value=None, maxsize=None, table=None):
+    """
+    Memoization decorator for functions taking one or more arguments.
+    Use it as @memoize, or as @memoize(maxsize=100, table=0) to bound the
+    size of the cache and record which table type each entry belongs to
+    """
+    if value is None:
+        return lambda function: memoize(function, maxsize, table)
+    cache = Memodict(value, maxsize, table)
+    CACHES[cache.cache_id] = cache
+    return cache
+
+
+def swap_entries(entries):
+    """
+    use the entries dict, keyed on the cache_id, for every cache in the current
+    thread, a cache not in it starting empty, and return the dict replaced
+    """
+    replaced = THREAD_ENTRIES.entries
+    THREAD_ENTRIES.entries = entries
+    return replaced
+
+
+def cache_name(cache):
+    return "%s.%s" % (cache.value.__module__, cache.value.__name__)
+
+
+def clear_caches(table_type=None):
+    """
+    clear all the memoization caches, or only the entries belonging to the
+    table type if specified, and reset the hit and miss counts when clearing all
+    """
+    for cache in list(CACHES.values()):
+        if table_type is None:
+            cache.clear()
+            cache.hits = 0
+            cache.misses = 0
+        else:
+            cache.clear_table(table_type)
+    LOGGER.info("cleared caches for table %s", table_type)
+
+
+def cache_info():
+    "hit and miss counts and sizes of each cache, keyed on the function name"
+    caches = sorted(CACHES.values(), key=cache_name)
+    return OrderedDict((cache_name(cache), cache.info()) for cache in caches)
@@ -0,0 +1,173 @@
+"""
+Command line batch runner, builds articles from a folder of CSV exports and
+writes each article as a line of JSON
+
+    ejpcsvparser build --csv-dir exports/ --ids 21598 12717 --jobs 4
+    ejpcsvparser build --archive exports.zip
+
+the error messages of articles which could not be built are written as lines
+of JSON to the --errors file, standard error by default, followed by the
+throughput and peak memory use of the run
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from ejpcsvparser import csv_data as data
+from ejpcsvparser import parse
+
+
+def to_dict(value, parents=()):
+    """
+    JSON serialisable copy of an article or any value it holds, objects become
+    a dict of their attributes and dates an ISO date string
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, time.struct_time):
+        return time.strftime("%Y-%m-%d", value)
+    if id(value) in parents:
+        # do not follow references back to an object already being converted
+        return None
+    parents = parents + (id(value),)
+    if isinstance(value, dict):
+        return OrderedDict(
+            (str(key), to_dict(item, parents)) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple, set)):
+        return [to_dict(item, parents) for item in value]
+    if hasattr(value, "__dict__"):
+        return OrderedDict(
+            (key, to_dict(item, parents))
+            for key, item in vars(value).items()
+            if not key.startswith("_")
+        )
+    return str(value)
+
+
+def peak_rss_mb(children=False):
+    """
+    peak resident set size in MB of this process, or of its largest child
+    process, ru_maxrss is in bytes on macOS and kB elsewhere
+    """
+    # not available on Windows
+    import resource
+
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    max_rss = resource.getrusage(who).ru_maxrss
+    if sys.platform == "darwin":
+        return max_rss / 1e6
+    return max_rss / 1e3
+
+
+def build(args):
+    "build the articles from a CsvExport of the --csv-dir or --archive CSV files"
+    export_settings = {}
+    if args.csv_dir:
+        export_settings["csv_path"] = os.path.join(args.csv_dir, "")
+    if args.archive:
+        export_settings["csv_archive"] = args.archive
+    with data.CsvExport(**export_settings):
+        return write_articles(args)
+
+
+def write_articles(args):
+    article_ids = args.ids
+    if not article_ids:
+        article_ids = list(data.index_table_on_article_id("manuscript").keys())
+    output = args.output or sys.stdout
+    errors = args.errors or sys.stderr
+
+    start = time.monotonic()
+    if args.jobs > 1:
+        results = parse.build_articles_parallel(article_ids, workers=args.jobs)
+    else:
+        results = parse.build_articles(article_ids)
+    error_articles = 0
+    for article_id, (article, error_count, error_messages) in zip(
+        article_ids, results
+    ):
+        if article is not None:
+            output.write(json.dumps(to_dict(article)) + "\n")
+        else:
+            error_articles += 1
+            errors.write(
+                json.dumps(
+                    OrderedDict(
+                        [
+                            ("article_id", str(article_id)),
+                            ("error_count", error_count),
+                            ("errors", error_messages),
+                        ]
+                    )
+                )
+                + "\n"
+            )
+    output.flush()
+    seconds = time.monotonic() - start
+    for stream in (args.output, args.errors):
+        if stream:
+            stream.close()
+
+    sys.stderr.write(
+        "built %s articles, %s with errors, in %.2f seconds, %.1f articles per second\n"
+        % (
+            len(article_ids),
+            error_articles,
+            seconds,
+            len(article_ids) / seconds if seconds else 0.0,
+        )
+    )
+    sys.stderr.write(
+        "peak RSS %.1f MB, %.1f MB largest worker process\n"
+        % (peak_rss_mb(), peak_rss_mb(children=True))
+    )
+    return 1 if error_articles else 0
+
+
+def parser():
+    arg_parser = argparse.ArgumentParser(
+        prog="ejpcsvparser", description="Build articles from EJP CSV exports"
+    )
+    subparsers = arg_parser.add_subparsers(dest="command")
+    subparsers.required = True
+    build_parser = subparsers.add_parser(
+        "build", help="build articles and write them as JSON Lines"
+    )
+    build_parser.add_argument(
+        "--csv-dir", help="folder of the CSV files, default the CSV_PATH setting"
+    )
+    build_parser.add_argument(
+        "--archive", help="zip or tar archive of the CSV files, read without extracting"
+    )
+    build_parser.add_argument(
+        "--ids",
+        nargs="+",
+        help="manuscript numbers to build, default every manuscript in the export",
+    )
+    build_parser.add_argument(
+        "--jobs", type=int, default=1, help="number of worker processes"
+    )
+    build_parser.add_argument(
+        "--output",
+        type=argparse.FileType("w"),
+        help="file to write the articles to, default standard output",
+    )
+    build_parser.add_argument(
+        "--errors",
+        type=argparse.FileType("w"),
+        help="file to write the article errors to, default standard error",
+    )
+    build_parser.set_defaults(function=build)
+    return arg_parser
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
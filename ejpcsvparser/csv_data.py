@@ -1,39 +1,120 @@
 import logging
+import concurrent.futures
+import contextlib
+import copy
 import csv
+import hashlib
+import heapq
 import io
+import itertools
+import mmap
+import multiprocessing
 import os
-from collections import defaultdict, OrderedDict
-from ejpcsvparser import LOGGER, settings, utils
+import pickle
+import posixpath
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from array import array
+from collections import defaultdict, namedtuple, OrderedDict
+from ejpcsvparser import LOGGER, StructuredMessage, __version__, settings, utils
+from ejpcsvparser import profiling
+from ejpcsvparser.cache import DEFAULT_ENTRIES, memoize, clear_caches, swap_entries
 
 
 # todo!! clean up these values and the settings
 CSV_PATH = settings.CSV_PATH
+CSV_ARCHIVE = settings.CSV_ARCHIVE
 TMP_DIR = settings.TMP_DIR
+CLEAN_CSV_TO_TMP_DIR = settings.CLEAN_CSV_TO_TMP_DIR
 ROWS_WITH_COLNAMES = settings.ROWS_WITH_COLNAMES
 DATA_START_ROW = settings.DATA_START_ROW
 CSV_FILES = settings.CSV_FILES
 COLUMN_HEADINGS = settings.CSV_COLUMN_HEADINGS
 OVERFLOW_CSV_FILES = settings.OVERFLOW_CSV_FILES
+ATTRIBUTE_CACHE_SIZE = settings.ATTRIBUTE_CACHE_SIZE
+COLUMNAR_TABLES = settings.COLUMNAR_TABLES
+INTERNED_COLUMNS = settings.INTERNED_COLUMNS
+MMAP_TABLES = settings.MMAP_TABLES
+AUTO_RELOAD_INTERVAL = settings.AUTO_RELOAD_INTERVAL
+TABLE_SIGNATURE_CHECKSUM = settings.TABLE_SIGNATURE_CHECKSUM
+PARSED_CACHE_DIR = settings.PARSED_CACHE_DIR
+PARSED_CACHE_KEEP = settings.PARSED_CACHE_KEEP
 
+# change this when the parsed table format changes to ignore older cache files
+PARSED_CACHE_FORMAT = 1
 
-def memoize(value):
-    "Memoization decorator for functions taking one or more arguments."
 
-    class Memodict(dict):
-        "Memoization dict"
+# held while reading a CSV_ARCHIVE file object, which threads share
+ARCHIVE_LOCK = threading.RLock()
 
-        def __init__(self, value):
-            dict.__init__(self)
-            self.value = value
+# tables whose rows are read by the author and funding indexes rather than
+# through get_article_attributes(), kept as rows when COLUMNAR_TABLES is set
+ROW_TABLES = ["authors", "funding"]
 
-        def __call__(self, *args):
-            return self[args]
+# record class of each table type and tuple of column names, see get_row_class(),
+# kept for every export rather than swapped with the caches
+ROW_CLASSES = {}
 
-        def __missing__(self, key):
-            ret = self[key] = self.value(*key)
-            return ret
+# file signature of each table when it was loaded, to detect changes
+TABLE_SIGNATURES = {}
 
-    return Memodict(value)
+# time.monotonic() value when the CSV files were last checked for changes
+LAST_RELOAD_CHECK = None
+
+# column name to position dict of each table read, see get_csv_col_positions()
+COL_POSITIONS = {}
+
+# module globals of which each CsvExport has its own values
+EXPORT_SETTINGS = [
+    "CSV_PATH",
+    "CSV_ARCHIVE",
+    "TMP_DIR",
+    "CLEAN_CSV_TO_TMP_DIR",
+    "ROWS_WITH_COLNAMES",
+    "DATA_START_ROW",
+    "CSV_FILES",
+    "COLUMN_HEADINGS",
+    "OVERFLOW_CSV_FILES",
+    "AUTO_RELOAD_INTERVAL",
+    "TABLE_SIGNATURE_CHECKSUM",
+    "PARSED_CACHE_DIR",
+    "PARSED_CACHE_KEEP",
+    "COLUMNAR_TABLES",
+    "INTERNED_COLUMNS",
+    "MMAP_TABLES",
+]
+EXPORT_STATE = ["TABLE_SIGNATURES", "LAST_RELOAD_CHECK", "COL_POSITIONS"]
+
+
+class ActiveExport(threading.local):
+    "the export activated in each thread, None for the DEFAULT_EXPORT"
+
+    export = None
+
+    def __init__(self):
+        self.previous_exports = []
+
+
+ACTIVE = ActiveExport()
+
+
+def get_active_export():
+    "the export the module functions use in the current thread"
+    return ACTIVE.export or DEFAULT_EXPORT
+
+
+def get_setting(name):
+    "value of the EXPORT_SETTINGS or EXPORT_STATE name in the active export"
+    return (ACTIVE.export or DEFAULT_EXPORT).values[name]
+
+
+def column_heading(heading):
+    "the column name of the COLUMN_HEADINGS heading in the active export"
+    return get_setting("COLUMN_HEADINGS")[heading]
 
 
 def get_csv_path(path_type):
@@ -44,51 +125,421 @@ def get_csv_path(path_type):
     This is the only function where the path the our actual data files
     are set.
     """
-    path = CSV_PATH + CSV_FILES[path_type]
+    path = get_setting("CSV_PATH") + get_setting("CSV_FILES")[path_type]
     return path
 
 
-@memoize
+def stream_checksum(open_file):
+    "SHA-1 hex digest of the contents of the binary file object"
+    digest = hashlib.sha1()
+    for chunk in iter(lambda: open_file.read(1024 * 1024), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_checksum(path):
+    "SHA-1 hex digest of the file contents"
+    with open(path, "rb") as open_file:
+        return stream_checksum(open_file)
+
+
+def archive_member_name(names, file_name):
+    "name of the archive member with the file name, in any folder of the archive"
+    for name in names:
+        if posixpath.basename(name) == file_name:
+            return name
+    return None
+
+
+def open_tar_archive(archive):
+    "open the tar archive, given as a path or a binary file object, for reading"
+    if hasattr(archive, "seek"):
+        archive.seek(0)
+        return tarfile.open(fileobj=archive, mode="r:*")
+    return tarfile.open(archive, mode="r:*")
+
+
+def is_tar_archive(archive):
+    "whether the archive, given as a path or a binary file object, is not a zip file"
+    if hasattr(archive, "seek"):
+        archive.seek(0)
+    return not zipfile.is_zipfile(archive)
+
+
+def archive_lock(archive):
+    "ARCHIVE_LOCK for an archive file object, a lock which is not shared otherwise"
+    if hasattr(archive, "read"):
+        return ARCHIVE_LOCK
+    return threading.Lock()
+
+
+@contextlib.contextmanager
+def open_archive_member(archive, file_name):
+    """
+    open the member with the file name of the zip or tar archive, given as a
+    path or a seekable binary file object, as a binary file object without
+    extracting the archive, raises FileNotFoundError if there is no such member
+    """
+    if hasattr(archive, "seek"):
+        archive.seek(0)
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zip_file:
+            name = archive_member_name(zip_file.namelist(), file_name)
+            if name is not None:
+                with zip_file.open(name) as open_file:
+                    yield open_file
+                return
+    else:
+        with open_tar_archive(archive) as tar_file:
+            # stop reading the archive at the member, compressed tar files
+            # are read from the start for each member, see load_archive_tables()
+            for member in tar_file:
+                if member.isfile() and archive_member_name([member.name], file_name):
+                    with tar_file.extractfile(member) as open_file:
+                        yield open_file
+                    return
+    raise FileNotFoundError("%s not found in archive %s" % (file_name, archive))
+
+
+class ArchiveView(io.RawIOBase):
+    """
+    reader of a CSV_ARCHIVE file object with a position of its own, so the
+    members open at the same time in a thread, as iter_article_bundles()
+    reads them, do not move each other's place in the shared file object
+    """
+
+    def __init__(self, archive):
+        super(ArchiveView, self).__init__()
+        self.archive = archive
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        self.archive.seek(self.position)
+        data = self.archive.read(len(buffer))
+        buffer[: len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.archive.seek(0, io.SEEK_END)
+        self.position = offset
+        return self.position
+
+    def tell(self):
+        return self.position
+
+
+@contextlib.contextmanager
+def open_csv_binary(table_type, source=None):
+    """
+    open the CSV file of the table, from CSV_ARCHIVE if it is set, in binary
+    mode, or the source if given, either the contents of the file in bytes or
+    an open binary file. A member of an archive file object is read while
+    holding ARCHIVE_LOCK, so one thread at a time reads the shared file object
+    """
+    archive = get_setting("CSV_ARCHIVE")
+    file_name = get_setting("CSV_FILES")[table_type]
+    if isinstance(source, bytes):
+        yield io.BytesIO(source)
+    elif source is not None:
+        yield source
+    elif archive is None:
+        with open(get_csv_path(table_type), "rb") as open_file:
+            yield open_file
+    elif hasattr(archive, "read"):
+        with ARCHIVE_LOCK:
+            with open_archive_member(ArchiveView(archive), file_name) as open_file:
+                yield open_file
+    else:
+        with open_archive_member(archive, file_name) as open_file:
+            yield open_file
+
+
+@contextlib.contextmanager
+def open_csv_file(table_type, source=None):
+    """
+    open the CSV file of the table, from CSV_ARCHIVE if it is set, as text,
+    or the source if given in bytes or as an open binary file
+    """
+    if get_setting("CSV_ARCHIVE") is None and source is None:
+        with open(get_csv_path(table_type), "r") as open_file:
+            yield open_file
+    else:
+        with open_csv_binary(table_type, source) as open_file:
+            yield io.TextIOWrapper(open_file)
+
+
+def read_csv_content(table_type, source=None):
+    "the contents in bytes of the CSV file of the table, or of the open source file"
+    with open_csv_binary(table_type, source) as open_file:
+        return open_file.read()
+
+
+def get_csv_location(table_type):
+    "path of the CSV file of the table, for logging, including the archive if set"
+    archive = get_setting("CSV_ARCHIVE")
+    if archive is None:
+        return get_csv_path(table_type)
+    archive = getattr(archive, "name", archive)
+    return "%s:%s" % (archive, get_setting("CSV_FILES")[table_type])
+
+
+def get_table_signature(table_type):
+    """
+    modified time and size of the table CSV file, and its checksum if
+    TABLE_SIGNATURE_CHECKSUM is set, or None if the file is missing.
+    When reading from CSV_ARCHIVE it is the signature of the archive file,
+    and None for an archive file object, which is not checked for changes
+    """
+    path = get_csv_path(table_type)
+    archive = get_setting("CSV_ARCHIVE")
+    if archive is not None:
+        if hasattr(archive, "read"):
+            return None
+        path = archive
+    try:
+        stat = os.stat(path)
+        if get_setting("TABLE_SIGNATURE_CHECKSUM"):
+            return (stat.st_mtime_ns, stat.st_size, file_checksum(path))
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def clear_table_caches(table_type=None):
+    "clear the cached data for the table, or for all tables if not specified"
+    clear_caches(table_type)
+    if table_type is None:
+        get_setting("TABLE_SIGNATURES").clear()
+        get_setting("COL_POSITIONS").clear()
+    else:
+        get_setting("TABLE_SIGNATURES").pop(table_type, None)
+        get_setting("COL_POSITIONS").pop(table_type, None)
+
+
+def invalidate_stale_tables():
+    """
+    clear the cached data of each loaded table whose CSV file has changed
+    since it was loaded, return the list of table types cleared
+    """
+    stale_table_types = [
+        table_type
+        for table_type, signature in list(get_setting("TABLE_SIGNATURES").items())
+        if get_table_signature(table_type) != signature
+    ]
+    for table_type in stale_table_types:
+        LOGGER.info("table %s has changed, clearing its cached data", table_type)
+        clear_table_caches(table_type)
+    return stale_table_types
+
+
+def reload_changed_tables():
+    """
+    clear and load again each table whose CSV file has changed, leaving the
+    cached data of the other tables in place, return the list of table types
+    """
+    changed_table_types = invalidate_stale_tables()
+    # a missing file cannot be loaded again until it is replaced
+    index_tables(
+        [
+            table_type
+            for table_type in changed_table_types
+            if get_table_signature(table_type) is not None
+        ]
+    )
+    return changed_table_types
+
+
+def auto_reload_tables():
+    """
+    when AUTO_RELOAD_INTERVAL is set and that many seconds have passed since the
+    last check, reload the tables whose CSV files have changed
+    """
+    values = get_active_export().values
+    interval = values["AUTO_RELOAD_INTERVAL"]
+    if interval is None:
+        return []
+    now = time.monotonic()
+    last_check = values["LAST_RELOAD_CHECK"]
+    if last_check is not None and now - last_check < interval:
+        return []
+    values["LAST_RELOAD_CHECK"] = now
+    return reload_changed_tables()
+
+
+class CsvExport(object):
+    """
+    A set of CSV export files with its own settings, loaded tables, indexes
+    and caches, so more than one export can be used in the same process
+
+        export = CsvExport(csv_path="exports/2017-01-31/")
+        with export:
+            article, error_count, error_messages = parse.build_article(21598)
+
+    The functions of this module use the active export of the current thread,
+    which is the default export of the module globals until another is
+    activated. Functions of this module can also be called on an export to
+    run them with it active, for example export.get_doi(21598). Activating an
+    export in a thread does not change the export other threads use, and an
+    export no longer used is garbage collected.
+    The settings not given are copied from those of the active export.
+    """
+
+    def __init__(self, **export_settings):
+        active_values = get_active_export().values
+        self.values = OrderedDict(
+            (name, active_values[name]) for name in EXPORT_SETTINGS
+        )
+        for name, value in export_settings.items():
+            if name.upper() not in self.values:
+                raise TypeError("%s is not an export setting" % name)
+            self.values[name.upper()] = value
+        for name, value in self.values.items():
+            # the export has its own copy of the list and dict settings
+            if isinstance(value, (list, dict)):
+                self.values[name] = copy.copy(value)
+        self.values["TABLE_SIGNATURES"] = {}
+        self.values["LAST_RELOAD_CHECK"] = None
+        self.values["COL_POSITIONS"] = {}
+        self.cache_entries = {}
+
+    def activate(self):
+        """
+        make this the export the module functions use in the current thread,
+        return the export it replaces
+        """
+        previous = get_active_export()
+        ACTIVE.export = self
+        swap_entries(self.cache_entries)
+        return previous
+
+    def __enter__(self):
+        ACTIVE.previous_exports.append(self.activate())
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ACTIVE.previous_exports.pop().activate()
+
+    def __getattr__(self, name):
+        function = globals().get(name)
+        if name.startswith("_") or isinstance(function, type) or not callable(function):
+            raise AttributeError(name)
+
+        def call_in_export(*args, **kwargs):
+            with self:
+                return function(*args, **kwargs)
+
+        return call_in_export
+
+    def build_article(self, article_id):
+        "build the article from this export, see parse.build_article"
+        from ejpcsvparser import parse
+
+        with self:
+            return parse.build_article(article_id)
+
+    def build_articles(self, article_ids):
+        "build each article from this export in turn, see parse.build_articles"
+        with self:
+            index_tables()
+        for article_id in article_ids:
+            yield self.build_article(article_id)
+
+
+# the export of the module globals and the caches threads use until they
+# activate another export
+DEFAULT_EXPORT = CsvExport.__new__(CsvExport)
+DEFAULT_EXPORT.values = globals()
+DEFAULT_EXPORT.cache_entries = DEFAULT_ENTRIES
+
+
+@memoize(table=0)
 def get_csv_col_names(table_type):
-    LOGGER.info("in get_csv_col_names")
-    LOGGER.info(table_type)
+    "the column names in the header row of the table"
     sheet = get_csv_sheet(table_type)
-    LOGGER.info(sheet)
-    LOGGER.info(str(ROWS_WITH_COLNAMES))
-    columns_row = []
-    for index, row in enumerate(sheet):
-        LOGGER.info("in enumerate")
-        LOGGER.info("%s %s", str(index), str(row))
-        LOGGER.debug("%s %s", str(index), str(ROWS_WITH_COLNAMES))
-        if int(index) == int(ROWS_WITH_COLNAMES):
-            columns_row = row
-    return columns_row
-
-
-@memoize
+    if len(sheet) > get_setting("ROWS_WITH_COLNAMES"):
+        return sheet[get_setting("ROWS_WITH_COLNAMES")]
+    return []
+
+
+@memoize(table=0)
 def get_csv_data_rows(table_type):
     sheet = get_csv_sheet(table_type)
-    rows = []
-    for row in sheet:
-        rows.append(row)
-    data_rows = rows[DATA_START_ROW:]
+    data_rows = sheet[get_setting("DATA_START_ROW"):]
     return data_rows
 
 
+def get_csv_col_positions(table_type):
+    """
+    map each column name of the table to its position in the row, built once
+    per table and kept in COL_POSITIONS, a plain dict rather than a memoize
+    cache so reading a cell does not pay for a cache lookup
+    """
+    table_positions = get_setting("COL_POSITIONS")
+    col_positions = table_positions.get(table_type)
+    if col_positions is None:
+        col_positions = {}
+        for position, col_name in enumerate(get_csv_col_names(table_type)):
+            # match list.index() which finds the first occurrence of a name
+            col_positions.setdefault(col_name, position)
+        table_positions[table_type] = col_positions
+    return col_positions
+
+
+def get_col_position(table_type, col_name):
+    "position of the named column in the table, raises ValueError if not found"
+    try:
+        return get_csv_col_positions(table_type)[col_name]
+    except KeyError:
+        raise ValueError("%s is not a column in %s" % (col_name, table_type))
+
+
+def get_position_value(position, row):
+    "value of the cell at position in the row, if there is one"
+    if row and position and len(row) > position:
+        return row[position]
+    return None
+
+
+def get_table_cell_value(table_type, col_name, row):
+    "fast accessor for a cell value using the column positions of the table"
+    try:
+        position = (ACTIVE.export or DEFAULT_EXPORT).values["COL_POSITIONS"][
+            table_type
+        ][col_name]
+    except KeyError:
+        position = get_col_position(table_type, col_name)
+    # get_position_value() inlined, as this is called for every cell read
+    if row and position and len(row) > position:
+        return row[position]
+    return None
+
+
 def get_cell_value(col_name, col_names, row):
     """
     we pass the name of the col and a copy of the col names row in to
     this fucntion so that we don't have to worry about knowing what the
     index of a specific col name is.
     """
-    position = col_names.index(col_name)
-    if row and position and len(row) > position:
-        return row[position]
-    return None
+    return get_position_value(col_names.index(col_name), row)
 
 
-def join_lines(line_one, line_two, line_number, data_start_row=DATA_START_ROW):
-    "join multiple lines together taking into account the header rows"
+def join_lines(line_one, line_two, line_number, data_start_row=None):
+    """
+    join multiple lines together taking into account the header rows,
+    data_start_row is the DATA_START_ROW of the active export if not specified
+    """
+    if data_start_row is None:
+        data_start_row = get_setting("DATA_START_ROW")
     if line_number <= data_start_row:
         # keep blank lines found in the headers
         content = line_two
@@ -101,83 +552,466 @@ def join_lines(line_one, line_two, line_number, data_start_row=DATA_START_ROW):
     return content
 
 
-def do_add_line(content, line_number, data_start_row=DATA_START_ROW):
-    "decide if the line should be added to the output"
+def do_add_line(content, line_number, data_start_row=None):
+    """
+    decide if the line should be added to the output,
+    data_start_row is the DATA_START_ROW of the active export if not specified
+    """
+    if data_start_row is None:
+        data_start_row = get_setting("DATA_START_ROW")
     add_line = False
     if line_number <= data_start_row or content.rstrip().endswith('"'):
         add_line = True
     return add_line
 
 
-def flatten_lines(iterable, data_start_row=DATA_START_ROW):
-    "iterate through an open file and join lines"
-    clean_csv_data = ""
+def iter_flatten_lines(iterable, data_start_row=None):
+    """
+    iterate through an open file and join lines, yielding each
+    logical record as soon as it is complete, data_start_row is the
+    DATA_START_ROW of the active export if not specified
+    """
+    if data_start_row is None:
+        data_start_row = get_setting("DATA_START_ROW")
     line_number = 1
-    prev_line = ""
+    # the parts of the record so far, joined only when it is yielded
+    parts = []
     add_line = False
     for content in iterable:
         content = utils.decode_cp1252(content)
         # add the line based on the previous iteration value
         if add_line:
-            clean_csv_data += prev_line
-            prev_line = ""
-        prev_line = join_lines(prev_line, content, line_number, data_start_row)
+            if parts:
+                yield "".join(parts)
+            parts = []
+        if parts and line_number > data_start_row:
+            # only the end of the record is changed by joining another line
+            parts[-1] = parts[-1].rstrip("\r\n")
+        else:
+            parts = []
+        parts.append(join_lines("", content, line_number, data_start_row))
         add_line = do_add_line(content, line_number, data_start_row)
         line_number += 1
     # Add the final line
-    clean_csv_data += prev_line
-    return clean_csv_data
+    if parts:
+        yield "".join(parts)
+
+
+def flatten_lines(iterable, data_start_row=None):
+    "iterate through an open file and join lines"
+    return "".join(iter_flatten_lines(iterable, data_start_row))
+
+
+def write_clean_csv(open_read_file, new_path, encoding=None):
+    "write the lines of the open CSV file to new_path with its oddities fixed"
+    with open(new_path, "w", encoding=encoding) as open_write_file:
+        open_write_file.writelines(
+            iter_flatten_lines(open_read_file, get_setting("DATA_START_ROW"))
+        )
+    return new_path
 
 
-@memoize
 def clean_csv(path):
-    "fix CSV file oddities making it difficult to parse"
-    clean_csv_data = ""
-    new_path = os.path.join(TMP_DIR, os.path.split(path)[-1])
+    "fix CSV file oddities making it difficult to parse, writing it to TMP_DIR"
+    new_path = os.path.join(get_setting("TMP_DIR"), os.path.split(path)[-1])
     with open(path, "r") as open_read_file:
-        clean_csv_data = flatten_lines(open_read_file)
-    with open(new_path, "w") as open_write_file:
-        open_write_file.write(clean_csv_data)
-    return new_path
+        return write_clean_csv(open_read_file, new_path)
 
 
-@memoize
-def get_csv_sheet(table_type):
-    LOGGER.info("in get_csv_sheet")
-    path = get_csv_path(table_type)
-    LOGGER.info(str(path))
-
-    path = clean_csv(path)
-
-    # https://docs.python.org/3/library/functions.html#open
-    handle = io.open(path, "r", newline="", encoding="utf-8", errors="surrogateescape")
-
-    with handle as csvfile:
-        csvreader = csv.reader(csvfile, delimiter=",", quotechar='"')
-        sheet = []
-        for row in csvreader:
-            sheet.append(row)
-    # For overflow file types, parse again with no quotechar
-    if table_type in OVERFLOW_CSV_FILES:
-        with open(path) as csvfile:
-            csvreader = csv.reader(csvfile, delimiter=",", quotechar=None)
-            if table_type in ["ethics", "datasets"]:
-                join_cells_from = 3
-            else:
-                join_cells_from = 2
-            for row in csvreader:
-                if csvreader.line_num <= DATA_START_ROW:
-                    continue
-                # Merge cells 3 to the end because any commas will cause extra columns
-                row[join_cells_from] = ",".join(row[join_cells_from:])
-                for index, cell in enumerate(row):
-                    # Strip leading quotation marks
-                    row[index] = cell.lstrip('"').rstrip('"')
-                sheet[csvreader.line_num - 1] = row
+def split_overflow_record(record, join_cells_from):
+    """
+    split a record from an overflow file on its first commas only, because
+    any commas in the final cell will otherwise cause extra columns
+    """
+    row = record.rstrip("\r\n").split(",", join_cells_from)
+    # Strip leading and trailing quotation marks
+    return [cell.strip('"') for cell in row]
+
+
+def iter_overflow_records(records, join_cells_from):
+    "parse cleaned CSV records of an overflow file into rows one at a time"
+    # For overflow file types, only the header rows are parsed with a quotechar
+    records = iter(records)
+    header_records = itertools.islice(records, get_setting("DATA_START_ROW"))
+    for row in csv.reader(header_records, delimiter=",", quotechar='"'):
+        yield row
+    for record in records:
+        yield split_overflow_record(record, join_cells_from)
+
+
+def iter_csv_records(records, table_type):
+    "parse cleaned CSV records into rows one at a time"
+    join_cells_from = get_setting("OVERFLOW_CSV_FILES").get(table_type)
+    if join_cells_from is None:
+        return csv.reader(records, delimiter=",", quotechar='"')
+    return iter_overflow_records(records, join_cells_from)
+
+
+def parse_csv_records(records, table_type):
+    "parse cleaned CSV records into a list of rows in one pass"
+    return list(iter_csv_records(records, table_type))
+
+
+def table_checksum(table_type, source=None):
+    "SHA-1 hex digest of the contents of the CSV file of the table"
+    with open_csv_binary(table_type, source) as open_file:
+        return stream_checksum(open_file)
+
+
+def get_parsed_cache_path(table_type, source=None):
+    """
+    path of the parsed table cache file for the table, named with a checksum of
+    the CSV file, or of the source if given, the parser version and parsing
+    settings, or None if disabled
+    """
+    if get_setting("PARSED_CACHE_DIR") is None:
+        return None
+    digest = hashlib.sha1()
+    for value in [
+        table_checksum(table_type, source),
+        __version__,
+        PARSED_CACHE_FORMAT,
+        get_setting("DATA_START_ROW"),
+        get_setting("OVERFLOW_CSV_FILES").get(table_type),
+    ]:
+        digest.update(str(value).encode("utf-8"))
+    file_name = "%s-%s.pickle" % (table_type, digest.hexdigest())
+    return os.path.join(get_setting("PARSED_CACHE_DIR"), file_name)
+
+
+def read_parsed_cache(cache_path):
+    "parsed table from the cache file, or None if there is not a usable one"
+    try:
+        with open(cache_path, "rb") as open_file:
+            sheet = pickle.load(open_file)
+        # mark the cache file as recently used, see remove_old_parsed_caches()
+        os.utime(cache_path)
+        return sheet
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError) as exception:
+        LOGGER.warning("could not read parsed cache %s: %s", cache_path, exception)
+        return None
+
+
+def remove_old_parsed_caches(cache_path):
+    """
+    remove the cache files of the table of the parsed cache file other than the
+    PARSED_CACHE_KEEP most recently used, which may be for other exports
+    sharing PARSED_CACHE_DIR or for an earlier CSV file, version or settings
+    """
+    cache_dir, file_name = os.path.split(cache_path)
+    prefix = file_name.rsplit("-", 1)[0] + "-"
+    cache_files = []
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and name.endswith(".pickle"):
+            path = os.path.join(cache_dir, name)
+            try:
+                cache_files.append((os.stat(path).st_mtime_ns, path))
+            except FileNotFoundError:
+                # removed by another process
+                pass
+    cache_files.sort(reverse=True)
+    for _, path in cache_files[get_setting("PARSED_CACHE_KEEP") :]:
+        if path == cache_path:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def write_parsed_cache(cache_path, sheet):
+    """
+    save the parsed table to the cache file, replacing it in one step,
+    and remove the older cache files of the table
+    """
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+        with os.fdopen(handle, "wb") as open_file:
+            pickle.dump(sheet, open_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+        remove_old_parsed_caches(cache_path)
+    except OSError as exception:
+        LOGGER.warning("could not write parsed cache %s: %s", cache_path, exception)
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def iter_written_lines(lines, open_write_file):
+    "yield each of the lines after writing it to the open file"
+    for line in lines:
+        open_write_file.write(line)
+        yield line
+
+
+def read_csv_sheet(table_type, source=None):
+    """
+    read and parse the CSV file of the table, or the source if given in bytes
+    or as an open binary file, into a list of row lists. An archive member or
+    source file is read in one pass as it is parsed, unless PARSED_CACHE_DIR
+    is set, when its contents are read first to find the cache file
+    """
+    get_setting("TABLE_SIGNATURES")[table_type] = get_table_signature(table_type)
+    cache_path = None
+    if get_setting("PARSED_CACHE_DIR") is not None:
+        if not isinstance(source, bytes) and (
+            source is not None or get_setting("CSV_ARCHIVE") is not None
+        ):
+            # the checksum and the parsing each read the contents
+            source = read_csv_content(table_type, source)
+        cache_path = get_parsed_cache_path(table_type, source)
+        sheet = read_parsed_cache(cache_path)
+        if sheet is not None:
+            LOGGER.info("read parsed table from %s", cache_path)
+            return sheet
+
+    with contextlib.ExitStack() as stack:
+        open_read_file = stack.enter_context(open_csv_file(table_type, source))
+        records = iter_flatten_lines(open_read_file, get_setting("DATA_START_ROW"))
+        new_path = None
+        if get_setting("CLEAN_CSV_TO_TMP_DIR"):
+            # write the cleaned lines as they are parsed rather than reading twice
+            new_path = os.path.join(
+                get_setting("TMP_DIR"), get_setting("CSV_FILES")[table_type]
+            )
+            records = iter_written_lines(
+                records, stack.enter_context(open(new_path, "w"))
+            )
+        sheet = parse_csv_records(records, table_type)
+    if new_path:
+        LOGGER.info("cleaned CSV file written to %s", new_path)
+
+    if cache_path:
+        write_parsed_cache(cache_path, sheet)
     return sheet
 
 
-@memoize
+def get_row_class(table_type, col_names):
+    """
+    record class for the data rows of the table, a namedtuple with a field for
+    each column name, which stores a row more compactly than a list
+    """
+    row_class = ROW_CLASSES.get((table_type, col_names))
+    if row_class is None:
+        class_name = "".join(part.capitalize() for part in table_type.split("_"))
+        row_class = ROW_CLASSES.setdefault(
+            (table_type, col_names),
+            namedtuple(class_name + "Row", col_names, rename=True),
+        )
+    return row_class
+
+
+def make_row_record(row_class, row):
+    "record of the row, with None for missing cells and without any extra cells"
+    field_count = len(row_class._fields)
+    if len(row) < field_count:
+        row = list(row) + [None] * (field_count - len(row))
+    return row_class._make(row[:field_count])
+
+
+def intern_row_cells(row, positions):
+    "copy of the row with the values at the positions replaced by interned strings"
+    row = list(row)
+    for position in positions:
+        if position < len(row) and row[position]:
+            row[position] = sys.intern(row[position])
+    return row
+
+
+def sheet_records(table_type, sheet):
+    """
+    the sheet with each of its data rows as a record of the table row class,
+    and the values of the INTERNED_COLUMNS shared between rows
+    """
+    rows_with_colnames = get_setting("ROWS_WITH_COLNAMES")
+    data_start_row = get_setting("DATA_START_ROW")
+    interned_columns = get_setting("INTERNED_COLUMNS")
+    col_names = []
+    if len(sheet) > rows_with_colnames:
+        col_names = sheet[rows_with_colnames]
+    row_class = get_row_class(table_type, tuple(col_names))
+    interned_positions = [
+        position
+        for position, col_name in enumerate(col_names)
+        if col_name in interned_columns
+    ]
+    data_rows = sheet[data_start_row:]
+    if interned_positions:
+        data_rows = (intern_row_cells(row, interned_positions) for row in data_rows)
+    return sheet[:data_start_row] + [
+        make_row_record(row_class, row) for row in data_rows
+    ]
+
+
+class MappedTable(object):
+    """
+    Data rows of a cleaned CSV file in a memory map, with the offset of each
+    row in the file. A row is parsed and its cells decoded when one of its
+    cells is read, keeping only the last row read
+    """
+
+    def __init__(self, path, table_type):
+        self.table_type = table_type
+        self.join_cells_from = get_setting("OVERFLOW_CSV_FILES").get(table_type)
+        self.data_start_row = get_setting("DATA_START_ROW")
+        with open(path, "rb") as open_file:
+            if os.fstat(open_file.fileno()).st_size:
+                self.buffer = mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.buffer = b""
+        # start of each line, the data rows are those from DATA_START_ROW
+        self.offsets = array("q", [0])
+        position = self.buffer.find(b"\n")
+        while position != -1:
+            self.offsets.append(position + 1)
+            position = self.buffer.find(b"\n", position + 1)
+        if self.offsets[-1] < len(self.buffer):
+            self.offsets.append(len(self.buffer))
+        # the rows before the data rows, parsed into lists
+        line_count = min(self.data_start_row, len(self.offsets) - 1)
+        lines = [self.line(line_number) for line_number in range(line_count)]
+        self.header_rows = list(csv.reader(lines, delimiter=",", quotechar='"'))
+        self.col_count = 0
+        rows_with_colnames = get_setting("ROWS_WITH_COLNAMES")
+        if len(self.header_rows) > rows_with_colnames:
+            self.col_count = len(self.header_rows[rows_with_colnames])
+        self.last_row = (None, None)
+
+    def line(self, line_number):
+        start, end = self.offsets[line_number], self.offsets[line_number + 1]
+        return self.buffer[start:end].decode("utf-8")
+
+    def __len__(self):
+        return max(len(self.offsets) - 1 - self.data_start_row, 0)
+
+    def row_values(self, index):
+        "the cells of the data row, with None for missing cells"
+        last_index, values = self.last_row
+        if last_index == index:
+            return values
+        record = self.line(index + self.data_start_row)
+        if self.join_cells_from is None:
+            values = next(csv.reader([record], delimiter=",", quotechar='"'), [])
+        else:
+            values = split_overflow_record(record, self.join_cells_from)
+        if len(values) < self.col_count:
+            values += [None] * (self.col_count - len(values))
+        values = values[: self.col_count]
+        self.last_row = (index, values)
+        return values
+
+
+class MappedRow(object):
+    "a data row of a MappedTable, its cells are decoded when read"
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, position):
+        return self.table.row_values(self.index)[position]
+
+    def __len__(self):
+        return self.table.col_count
+
+    def __iter__(self):
+        return iter(self.table.row_values(self.index))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+def read_mapped_sheet(table_type, source=None):
+    """
+    clean the CSV file of the table, or the source if given in bytes or as an
+    open binary file, into a
+    file in TMP_DIR and return the sheet with its data rows read from a memory
+    map of the file, see MMAP_TABLES
+    """
+    get_setting("TABLE_SIGNATURES")[table_type] = get_table_signature(table_type)
+    file_handle, path = tempfile.mkstemp(
+        prefix="%s-" % table_type, suffix=".csv", dir=get_setting("TMP_DIR")
+    )
+    os.close(file_handle)
+    try:
+        with open_csv_file(table_type, source) as open_read_file:
+            write_clean_csv(open_read_file, path, encoding="utf-8")
+        table = MappedTable(path, table_type)
+    finally:
+        # the memory map remains readable after the file is removed
+        os.remove(path)
+    return table.header_rows + [MappedRow(table, index) for index in range(len(table))]
+
+
+def load_csv_sheet(table_type, source=None):
+    """
+    read the table, or the source if given in bytes or as an open binary file,
+    for get_csv_sheet
+    """
+    with profiling.timer("load_table.%s" % table_type):
+        if table_type in get_setting("MMAP_TABLES"):
+            return read_mapped_sheet(table_type, source)
+        return sheet_records(table_type, read_csv_sheet(table_type, source))
+
+
+@memoize(table=0)
+def get_csv_sheet(table_type):
+    LOGGER.info("%s", get_csv_location(table_type))
+    return load_csv_sheet(table_type)
+
+
+def load_archive_tables(table_types):
+    """
+    load each of the tables not loaded yet from a tar CSV_ARCHIVE in one pass
+    through the archive, parsing each CSV file as it is reached, because a
+    compressed tar file is read from the start again to reach each member.
+    Return a dict of the seconds taken to load each table, which is empty
+    for a zip archive, whose members are read directly as they are needed
+    """
+    load_times = OrderedDict()
+    table_file_names = dict(
+        (get_setting("CSV_FILES")[table_type], table_type)
+        for table_type in table_types
+        if (table_type,) not in get_csv_sheet
+    )
+    archive = get_setting("CSV_ARCHIVE")
+    if archive is None or not table_file_names:
+        return load_times
+    with archive_lock(archive):
+        if not is_tar_archive(archive):
+            return load_times
+        with open_tar_archive(archive) as tar_file:
+            for member in tar_file:
+                if not member.isfile():
+                    continue
+                table_type = table_file_names.pop(
+                    posixpath.basename(member.name), None
+                )
+                if table_type is None:
+                    continue
+                start = time.monotonic()
+                LOGGER.info("%s", get_csv_location(table_type))
+                with tar_file.extractfile(member) as open_file:
+                    get_csv_sheet[(table_type,)] = load_csv_sheet(
+                        table_type, open_file
+                    )
+                load_times[table_type] = time.monotonic() - start
+                if not table_file_names:
+                    break
+    return load_times
+
+
+@memoize(table=0)
 def index_table_on_article_id(table_type):
     """
     return a dict of the CSV file keyed on article_id
@@ -185,31 +1019,91 @@ def index_table_on_article_id(table_type):
     the name of the manuscript number column is hard wired in this function.
     """
 
-    LOGGER.info("in index_table_on_article_id")
-
-    # get the data and the row of colnames
+    # get the data rows
     data_rows = get_csv_data_rows(table_type)
-    col_names = get_csv_col_names(table_type)
-
-    # LOGGER.info("data_rows: " + str(data_rows))
-    LOGGER.info("col_names: %s", col_names)
+    LOGGER.debug(
+        StructuredMessage(
+            "index_table_on_article_id", table_type=table_type, rows=len(data_rows)
+        )
+    )
 
+    article_id_position = get_col_position(table_type, "poa_m_ms_no")
     article_index = defaultdict(list)
     for data_row in data_rows:
-        article_id = get_cell_value("poa_m_ms_no", col_names, data_row)
+        article_id = get_position_value(article_id_position, data_row)
         # author_id = get_cell_value("poa_a_id", col_names, data_row)
         article_index[article_id].append(data_row)
         # print article_id, author_id
     return article_index
 
 
-@memoize
+def is_columnar_table(table_type):
+    """
+    whether the table is kept as columns instead of rows, which is when
+    COLUMNAR_TABLES is set, other than for ROW_TABLES and MMAP_TABLES
+    """
+    return (
+        bool(get_setting("COLUMNAR_TABLES"))
+        and table_type not in ROW_TABLES
+        and table_type not in get_setting("MMAP_TABLES")
+    )
+
+
+@memoize(table=0)
+def get_table_columns(table_type):
+    """
+    columnar copy of the table data rows, grouped by article id in the order
+    each article first appears, returns an OrderedDict of column name to the
+    list of its values and a dict of article id to the (start, stop) range of
+    the article rows in each list. For a columnar table the loaded rows are
+    dropped once the columns are built, see is_columnar_table()
+    """
+    col_names = get_csv_col_names(table_type)
+    article_id_position = get_col_position(table_type, "poa_m_ms_no")
+    article_rows = OrderedDict()
+    for data_row in get_csv_data_rows(table_type):
+        article_id = get_position_value(article_id_position, data_row)
+        article_rows.setdefault(article_id, []).append(data_row)
+    rows = []
+    offsets = {}
+    for article_id, rows_of_article in article_rows.items():
+        offsets[article_id] = (len(rows), len(rows) + len(rows_of_article))
+        rows.extend(rows_of_article)
+    del article_rows
+    columns = OrderedDict()
+    for position, column in enumerate(zip(*rows) if rows else [()] * len(col_names)):
+        # keep the first column of a name, as get_col_position does
+        columns.setdefault(col_names[position], list(column))
+    if is_columnar_table(table_type):
+        # the column names and positions stay cached for get_col_position()
+        get_csv_sheet.clear_table(table_type)
+        get_csv_data_rows.clear_table(table_type)
+    return columns, offsets
+
+
+def get_column(table_type, col_name, article_id=None):
+    """
+    all the values of the named column of the table, or only the values for
+    the article if article_id is specified, raises ValueError if not a column
+    """
+    columns, offsets = get_table_columns(table_type)
+    try:
+        column = columns[col_name]
+    except KeyError:
+        raise ValueError("%s is not a column in %s" % (col_name, table_type))
+    if article_id is None:
+        return column
+    start, stop = offsets.get(str(article_id), (0, 0))
+    return column[start:stop]
+
+
+@memoize(table="authors")
 def index_authors_on_article_id():
     article_index = index_table_on_article_id("authors")
     return article_index
 
 
-@memoize
+@memoize(table="authors")
 def index_authors_on_author_id():
     # """
     # as we are going to be doing a lot of looking up authors by
@@ -217,7 +1111,7 @@ def index_authors_on_author_id():
     # so we are going to make a dict of dicts indexed on manuscript id and then author id
     # """
     table_type = "authors"
-    col_names = get_csv_col_names(table_type)
+    author_id_position = get_col_position(table_type, column_heading("author_id"))
     author_table = index_authors_on_article_id()
 
     article_ids = author_table.keys()
@@ -228,31 +1122,173 @@ def index_authors_on_author_id():
         rows = author_table[article_id]
         author_index = defaultdict()
         for row in rows:
-            author_id = get_cell_value("poa_a_id", col_names, row)
+            author_id = get_position_value(author_id_position, row)
             author_index[author_id] = row
         article_author_index[article_id] = author_index
     return article_author_index
 
 
-@memoize
-def get_article_attributes(article_id, attribute_type, attribute_label):
-    LOGGER.info("in get_article_attributes")
+def index_tables(table_types=None):
+    """
+    load and index each of the CSV tables on article_id in one pass,
+    including the author and funding indexes, so building many articles
+    afterwards does not repeat the work
+    """
+    if table_types is None:
+        table_types = list(get_setting("CSV_FILES").keys())
+    load_archive_tables(table_types)
+    for table_type in table_types:
+        if is_columnar_table(table_type):
+            get_table_columns(table_type)
+        else:
+            index_table_on_article_id(table_type)
+    if "authors" in table_types:
+        index_authors_on_author_id()
+    if "funding" in table_types:
+        index_funding_table()
+
+
+def iter_article_rows(table_type):
+    """
+    read the CSV file of the table one record at a time, yielding the list of
+    its header rows first, then a (manuscript number, article_id, rows) tuple
+    for each article, raises ValueError if the rows are not ordered by
+    the poa_m_ms_no manuscript number
+    """
+    with open_csv_file(table_type) as open_read_file:
+        data_start_row = get_setting("DATA_START_ROW")
+        records = iter_flatten_lines(open_read_file, data_start_row)
+        rows = iter_csv_records(records, table_type)
+        header_rows = list(itertools.islice(rows, data_start_row))
+        yield header_rows
+        col_names = []
+        rows_with_colnames = get_setting("ROWS_WITH_COLNAMES")
+        if len(header_rows) > rows_with_colnames:
+            col_names = header_rows[rows_with_colnames]
+        position = col_names.index("poa_m_ms_no")
+        previous_number = None
+        for article_id, article_rows in itertools.groupby(
+            rows, key=lambda row: get_position_value(position, row)
+        ):
+            number = int(article_id)
+            if previous_number is not None and number <= previous_number:
+                raise ValueError(
+                    "%s is not ordered by poa_m_ms_no, %s is after %s"
+                    % (table_type, article_id, previous_number)
+                )
+            previous_number = number
+            yield number, article_id, list(article_rows)
+
+
+def tag_table_index(index, article_rows):
+    "add the index of the table to each item of the iter_article_rows() articles"
+    for number, article_id, rows in article_rows:
+        yield number, index, article_id, rows
+
+
+def iter_article_bundles(table_types=None):
+    """
+    read the tables together, each ordered by poa_m_ms_no as EJP exports them,
+    merging them on manuscript number, and yield an (article_id, bundle) tuple
+    for each article in turn. The bundle is a dict of each table type to a
+    sheet of its header rows and the rows of the article, so only the rows of
+    one article are in memory at a time
+    """
+    if table_types is None:
+        table_types = list(get_setting("CSV_FILES").keys())
+    readers = [iter_article_rows(table_type) for table_type in table_types]
+    header_rows = [next(reader) for reader in readers]
+    articles = heapq.merge(
+        *[tag_table_index(index, reader) for index, reader in enumerate(readers)]
+    )
+    for _, table_articles in itertools.groupby(articles, key=lambda item: item[0]):
+        bundle = OrderedDict(zip(table_types, header_rows))
+        for _, index, article_id, rows in table_articles:
+            bundle[table_types[index]] = header_rows[index] + rows
+        yield article_id, bundle
+
+
+def article_bundle_export():
+    "a CsvExport for building articles from iter_article_bundles() bundles"
+    return CsvExport(auto_reload_interval=None, mmap_tables=[])
+
+
+def load_article_bundle(bundle):
+    """
+    replace the tables and caches of the active export with the tables of the
+    iter_article_bundles() bundle, call it on an article_bundle_export()
+    """
+    # empty every cache without logging each one, as clear_caches() does
+    export = get_active_export()
+    export.cache_entries.clear()
+    export.values["COL_POSITIONS"].clear()
+    for table_type, sheet in bundle.items():
+        get_csv_sheet[(table_type,)] = sheet_records(table_type, sheet)
+
+
+def load_table(table_type):
+    "load and index the table, return the number of seconds it took"
+    start = time.monotonic()
+    index_tables([table_type])
+    return time.monotonic() - start
+
+
+def get_process_context():
+    "multiprocessing context which forks, so workers share the loaded tables"
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def preload_tables(table_types=None, workers=None):
+    """
+    load and index the tables in a pool of threads, instead of one at a time as
+    articles are built. Reading the files overlaps but the parsing holds the
+    GIL, so this moves the loading to startup rather than making it faster.
+    The tables in a tar CSV_ARCHIVE are first read in one pass through it.
+    Return a dict of the seconds taken to load each table, the total time of
+    the call is logged
+    """
+    if table_types is None:
+        table_types = list(get_setting("CSV_FILES").keys())
+    start = time.monotonic()
+    archive_times = load_archive_tables(table_types)
+    load_times = OrderedDict()
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        # load the tables into the export of this thread, not that of the workers
+        results = executor.map(get_active_export().load_table, table_types)
+        for table_type, seconds in zip(table_types, results):
+            load_times[table_type] = archive_times.get(table_type, 0.0) + seconds
+    for table_type, seconds in load_times.items():
+        LOGGER.info("loaded table %s in %.3f seconds", table_type, seconds)
     LOGGER.info(
-        "article_id: %s attribute_type: %s attribute_label: %s",
-        article_id,
-        attribute_type,
-        attribute_label,
+        "loaded %s tables in %.3f seconds", len(table_types), time.monotonic() - start
     )
+    return load_times
+
+
+@memoize(maxsize=ATTRIBUTE_CACHE_SIZE, table=1)
+def get_article_attributes(article_id, attribute_type, attribute_label):
+    LOGGER.debug(
+        StructuredMessage(
+            "get_article_attributes",
+            article_id=article_id,
+            attribute_type=attribute_type,
+            attribute_label=attribute_label,
+        )
+    )
+    if is_columnar_table(attribute_type):
+        column = get_column(attribute_type, attribute_label, article_id)
+        if get_col_position(attribute_type, attribute_label):
+            return column
+        # get_position_value() has no value for the first column
+        return [None] * len(column)
     attributes = []
-    LOGGER.info("about to generate attribute index")
     attribute_index = index_table_on_article_id(attribute_type)
-    LOGGER.info("generated attribute index")
-    # LOGGER.info(str(attribute_index))
-    LOGGER.info("about to get col_names for colname %s", attribute_type)
-    col_names = get_csv_col_names(attribute_type)
+    position = get_col_position(attribute_type, attribute_label)
     attribute_rows = attribute_index[str(article_id)]
     for attribute_row in attribute_rows:
-        attributes.append(get_cell_value(attribute_label, col_names, attribute_row))
+        attributes.append(get_position_value(position, attribute_row))
     return attributes
 
 
@@ -271,81 +1307,81 @@ def article_first_value(article_id, file_name, column_name):
 
 # subjects table
 def get_subjects(article_id):
-    return article_all_values(article_id, "subjects", COLUMN_HEADINGS["subject_areas"])
+    return article_all_values(article_id, "subjects", column_heading("subject_areas"))
 
 
 # organisms table
 def get_organisms(article_id):
-    return article_all_values(article_id, "organisms", COLUMN_HEADINGS["organisms"])
+    return article_all_values(article_id, "organisms", column_heading("organisms"))
 
 
 # license table
 def get_license(article_id):
-    return article_first_value(article_id, "license", COLUMN_HEADINGS["license_id"])
+    return article_first_value(article_id, "license", column_heading("license_id"))
 
 
 # keywords table
 def get_keywords(article_id):
-    return article_all_values(article_id, "keywords", COLUMN_HEADINGS["keywords"])
+    return article_all_values(article_id, "keywords", column_heading("keywords"))
 
 
 # manuscript table
 @utils.entities
 def get_title(article_id):
-    return article_first_value(article_id, "title", COLUMN_HEADINGS["title"])
+    return article_first_value(article_id, "title", column_heading("title"))
 
 
 @utils.entities
 def get_abstract(article_id):
-    return article_first_value(article_id, "abstract", COLUMN_HEADINGS["abstract"])
+    return article_first_value(article_id, "abstract", column_heading("abstract"))
 
 
 def get_doi(article_id):
-    return article_first_value(article_id, "manuscript", COLUMN_HEADINGS["doi"])
+    return article_first_value(article_id, "manuscript", column_heading("doi"))
 
 
 def get_article_type(article_id):
     return article_first_value(
-        article_id, "manuscript", COLUMN_HEADINGS["article_type"]
+        article_id, "manuscript", column_heading("article_type")
     )
 
 
 def get_accepted_date(article_id):
     return article_first_value(
-        article_id, "manuscript", COLUMN_HEADINGS["accepted_date"]
+        article_id, "manuscript", column_heading("accepted_date")
     )
 
 
 def get_received_date(article_id):
-    return article_first_value(article_id, "received", COLUMN_HEADINGS["received_date"])
+    return article_first_value(article_id, "received", column_heading("received_date"))
 
 
 def get_receipt_date(article_id):
-    return article_first_value(article_id, "received", COLUMN_HEADINGS["receipt_date"])
+    return article_first_value(article_id, "received", column_heading("receipt_date"))
 
 
 def get_me_id(article_id):
-    return article_first_value(article_id, "manuscript", COLUMN_HEADINGS["editor_id"])
+    return article_first_value(article_id, "manuscript", column_heading("editor_id"))
 
 
 @utils.entities
 def get_me_last_nm(article_id):
     return article_first_value(
-        article_id, "manuscript", COLUMN_HEADINGS["editor_last_name"]
+        article_id, "manuscript", column_heading("editor_last_name")
     )
 
 
 @utils.entities
 def get_me_first_nm(article_id):
     return article_first_value(
-        article_id, "manuscript", COLUMN_HEADINGS["editor_first_name"]
+        article_id, "manuscript", column_heading("editor_first_name")
     )
 
 
 @utils.entities
 def get_me_middle_nm(article_id):
     return article_first_value(
-        article_id, "manuscript", COLUMN_HEADINGS["editor_middle_name"]
+        article_id, "manuscript", column_heading("editor_middle_name")
     )
 
 
@@ -353,7 +1389,7 @@ def get_me_middle_nm(article_id):
 def get_me_suffix(article_id):
     try:
         return article_first_value(
-            article_id, "manuscript", COLUMN_HEADINGS["editor_suffix"]
+            article_id, "manuscript", column_heading("editor_suffix")
         )
     except ValueError:
         return None
@@ -362,21 +1398,21 @@ def get_me_suffix(article_id):
 @utils.entities
 def get_me_institution(article_id):
     return article_first_value(
-        article_id, "manuscript", COLUMN_HEADINGS["editor_institution"]
+        article_id, "manuscript", column_heading("editor_institution")
     )
 
 
 @utils.entities
 def get_me_department(article_id):
     return article_first_value(
-        article_id, "manuscript", COLUMN_HEADINGS["editor_department"]
+        article_id, "manuscript", column_heading("editor_department")
     )
 
 
 @utils.entities
 def get_me_country(article_id):
     return article_first_value(
-        article_id, "manuscript", COLUMN_HEADINGS["editor_country"]
+        article_id, "manuscript", column_heading("editor_country")
     )
 
 
@@ -384,12 +1420,12 @@ def get_ethics(article_id):
     """
     needs a bit of refinement owing to serilaising of data by EJP
     """
-    return article_first_value(article_id, "ethics", COLUMN_HEADINGS["ethics"])
+    return article_first_value(article_id, "ethics", column_heading("ethics"))
 
 
 # authors table
 def get_author_ids(article_id):
-    return article_all_values(article_id, "authors", COLUMN_HEADINGS["author_id"])
+    return article_all_values(article_id, "authors", column_heading("author_id"))
 
 
 def get_author_attribute(article_id, author_id, attribute_name):
@@ -401,49 +1437,47 @@ def get_author_attribute(article_id, author_id, attribute_name):
         return None
     # continue
     data_row = article_author_index[article_id][author_id]
-    col_names = get_csv_col_names("authors")
-    attribute = get_cell_value(attribute_name, col_names, data_row)
-    return attribute
+    return get_table_cell_value("authors", attribute_name, data_row)
 
 
 def get_author_position(article_id, author_id):
     return get_author_attribute(
-        article_id, author_id, COLUMN_HEADINGS["author_position"]
+        article_id, author_id, column_heading("author_position")
     )
 
 
 def get_author_email(article_id, author_id):
-    return get_author_attribute(article_id, author_id, COLUMN_HEADINGS["email"])
+    return get_author_attribute(article_id, author_id, column_heading("email"))
 
 
 def get_author_contrib_type(article_id, author_id):
-    return get_author_attribute(article_id, author_id, COLUMN_HEADINGS["author_type"])
+    return get_author_attribute(article_id, author_id, column_heading("author_type"))
 
 
 def get_author_dual_corresponding(article_id, author_id):
     return get_author_attribute(
-        article_id, author_id, COLUMN_HEADINGS["dual_corresponding"]
+        article_id, author_id, column_heading("dual_corresponding")
     )
 
 
 @utils.entities
 def get_author_last_name(article_id, author_id):
     return get_author_attribute(
-        article_id, author_id, COLUMN_HEADINGS["author_last_name"]
+        article_id, author_id, column_heading("author_last_name")
     )
 
 
 @utils.entities
 def get_author_first_name(article_id, author_id):
     return get_author_attribute(
-        article_id, author_id, COLUMN_HEADINGS["author_first_name"]
+        article_id, author_id, column_heading("author_first_name")
     )
 
 
 @utils.entities
 def get_author_middle_name(article_id, author_id):
     return get_author_attribute(
-        article_id, author_id, COLUMN_HEADINGS["author_middle_name"]
+        article_id, author_id, column_heading("author_middle_name")
     )
 
 
@@ -451,7 +1485,7 @@ def get_author_middle_name(article_id, author_id):
 def get_author_suffix(article_id, author_id):
     try:
         return get_author_attribute(
-            article_id, author_id, COLUMN_HEADINGS["author_suffix"]
+            article_id, author_id, column_heading("author_suffix")
         )
     except ValueError:
         return None
@@ -460,55 +1494,55 @@ def get_author_suffix(article_id, author_id):
 @utils.entities
 def get_author_institution(article_id, author_id):
     return get_author_attribute(
-        article_id, author_id, COLUMN_HEADINGS["author_institution"]
+        article_id, author_id, column_heading("author_institution")
     )
 
 
 @utils.entities
 def get_author_department(article_id, author_id):
     return get_author_attribute(
-        article_id, author_id, COLUMN_HEADINGS["author_department"]
+        article_id, author_id, column_heading("author_department")
     )
 
 
 @utils.entities
 def get_author_city(article_id, author_id):
-    return get_author_attribute(article_id, author_id, COLUMN_HEADINGS["author_city"])
+    return get_author_attribute(article_id, author_id, column_heading("author_city"))
 
 
 @utils.entities
 def get_author_country(article_id, author_id):
     return get_author_attribute(
-        article_id, author_id, COLUMN_HEADINGS["author_country"]
+        article_id, author_id, column_heading("author_country")
     )
 
 
 def get_author_state(article_id, author_id):
-    return get_author_attribute(article_id, author_id, COLUMN_HEADINGS["author_state"])
+    return get_author_attribute(article_id, author_id, column_heading("author_state"))
 
 
 def get_author_conflict(article_id, author_id):
     return get_author_attribute(
-        article_id, author_id, COLUMN_HEADINGS["author_conflict"]
+        article_id, author_id, column_heading("author_conflict")
     )
 
 
 def get_author_orcid(article_id, author_id):
-    return get_author_attribute(article_id, author_id, COLUMN_HEADINGS["orcid"])
+    return get_author_attribute(article_id, author_id, column_heading("orcid"))
 
 
 def get_group_authors(article_id):
     return article_first_value(
-        article_id, "group_authors", COLUMN_HEADINGS["group_author"]
+        article_id, "group_authors", column_heading("group_author")
     )
 
 
 def get_datasets(article_id):
-    return article_first_value(article_id, "datasets", COLUMN_HEADINGS["datasets"])
+    return article_first_value(article_id, "datasets", column_heading("datasets"))
 
 
 # funding
-@memoize
+@memoize(table="funding")
 def index_funding_table():
     """
     Rows in the funding CSV are to be uniquely identified by three column values
@@ -517,22 +1551,21 @@ def index_funding_table():
     """
     table_type = "funding"
 
-    LOGGER.info("in index_funding_table")
-
-    # get the data and the row of colnames
+    # get the data rows
     data_rows = get_csv_data_rows(table_type)
-    col_names = get_csv_col_names(table_type)
+    LOGGER.debug(StructuredMessage("index_funding_table", rows=len(data_rows)))
 
-    # LOGGER.info("data_rows: " + str(data_rows))
-    LOGGER.info("col_names: %s", col_names)
+    article_id_position = get_col_position(table_type, "poa_m_ms_no")
+    author_id_position = get_col_position(table_type, column_heading("author_id"))
+    funder_position_position = get_col_position(
+        table_type, column_heading("funder_position")
+    )
 
     article_index = OrderedDict()
     for data_row in data_rows:
-        article_id = get_cell_value("poa_m_ms_no", col_names, data_row)
-        author_id = get_cell_value(COLUMN_HEADINGS["author_id"], col_names, data_row)
-        funder_position = get_cell_value(
-            COLUMN_HEADINGS["funder_position"], col_names, data_row
-        )
+        article_id = get_position_value(article_id_position, data_row)
+        author_id = get_position_value(author_id_position, data_row)
+        funder_position = get_position_value(funder_position_position, data_row)
 
         # Crude multidimentional dict builder
         if article_id not in article_index:
@@ -552,11 +1585,11 @@ def get_funding_ids(article_id):
     """
     funding_ids = []
 
-    for key, value in index_funding_table().items():
-        if key == article_id:
-            for key_2, value_2 in value.items():
-                for key_3 in value_2.keys():
-                    funding_ids.append((key, key_2, key_3))
+    # look up the article directly rather than iterating every article
+    author_index = index_funding_table().get(article_id, {})
+    for author_id, funder_position_index in author_index.items():
+        for funder_position in funder_position_index.keys():
+            funding_ids.append((article_id, author_id, funder_position))
 
     return funding_ids
 
@@ -568,30 +1601,28 @@ def get_funding_attribute(article_id, author_id, funder_position, attribute_name
         str(funder_position)
     ]
 
-    col_names = get_csv_col_names("funding")
-    attribute = get_cell_value(attribute_name, col_names, data_row)
-    return attribute
+    return get_table_cell_value("funding", attribute_name, data_row)
 
 
 def get_funder(article_id, author_id, funder_position):
     return get_funding_attribute(
-        article_id, author_id, funder_position, COLUMN_HEADINGS["funder"]
+        article_id, author_id, funder_position, column_heading("funder")
     )
 
 
 def get_award_id(article_id, author_id, funder_position):
     return get_funding_attribute(
-        article_id, author_id, funder_position, COLUMN_HEADINGS["award_id"]
+        article_id, author_id, funder_position, column_heading("award_id")
     )
 
 
 def get_funder_identifier(article_id, author_id, funder_position):
     return get_funding_attribute(
-        article_id, author_id, funder_position, COLUMN_HEADINGS["funder_identifier"]
+        article_id, author_id, funder_position, column_heading("funder_identifier")
     )
 
 
 def get_funding_note(article_id):
     return article_first_value(
-        article_id, "manuscript", COLUMN_HEADINGS["funding_note"]
+        article_id, "manuscript", column_heading("funding_note")
     )
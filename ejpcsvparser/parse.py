@@ -1,18 +1,17 @@
 from __future__ import print_function
 import logging
 import time
-from collections import OrderedDict
-from xml.dom import minidom
-from xml.parsers.expat import ExpatError
+from collections import defaultdict, OrderedDict
+from xml.etree import ElementTree
 from elifearticle import article as ea
 from elifearticle import utils as eautils
 from elifetools import utils as etoolsutils
-from ejpcsvparser import LOGGER, utils
+from ejpcsvparser import LOGGER, StructuredMessage, profiling, utils
 import ejpcsvparser.csv_data as data
 
 
 def instantiate_article(article_id):
-    LOGGER.info("in instantiate_article for %s", article_id)
+    LOGGER.debug("in instantiate_article for %s", article_id)
     doi = data.get_doi(article_id)
     if doi is not None:
         # Fallback if doi string is blank, default to eLife concatenated
@@ -24,7 +23,7 @@ def instantiate_article(article_id):
 
 
 def set_title(article, article_id):
-    LOGGER.info("in set_title")
+    LOGGER.debug("in set_title")
     title = data.get_title(article_id)
     if title:
         article.title = utils.convert_to_xml_string(title)
@@ -34,7 +33,7 @@ def set_title(article, article_id):
 
 
 def set_abstract(article, article_id):
-    LOGGER.info("in set_abstract")
+    LOGGER.debug("in set_abstract")
     raw_abstract = data.get_abstract(article_id)
     if raw_abstract:
         abstract = utils.decode_cp1252(raw_abstract)
@@ -46,7 +45,7 @@ def set_abstract(article, article_id):
 
 
 def set_article_type(article, article_id):
-    LOGGER.info("in set_article_type")
+    LOGGER.debug("in set_article_type")
     article_type_id = data.get_article_type(article_id)
     article_type_index = utils.article_type_indexes()
     if article_type_id in article_type_index:
@@ -58,7 +57,7 @@ def set_article_type(article, article_id):
 
 
 def set_license(article, article_id):
-    LOGGER.info("in set_license")
+    LOGGER.debug("in set_license")
     # if no article return False
     if not article:
         return False
@@ -108,7 +107,7 @@ def add_date_to_article(article, date_type, date_string):
     if date_string and date_struct:
         article_date = ea.ArticleDate(date_type, date_struct)
         article.add_date(article_date)
-        LOGGER.info(
+        LOGGER.debug(
             "set date_type %s from %s as %s", date_type, date_string, article_date
         )
         return True
@@ -116,7 +115,7 @@ def add_date_to_article(article, date_type, date_string):
 
 
 def set_dates(article, article_id):
-    LOGGER.info("in set_dates")
+    LOGGER.debug("in set_dates")
     if not article:
         return False
 
@@ -141,11 +140,11 @@ def set_dates(article, article_id):
 
 
 def set_ethics(article, article_id):
-    LOGGER.info("in set_ethics")
+    LOGGER.debug("in set_ethics")
     ethics = None
     parse_status = None
     ethic = data.get_ethics(article_id)
-    LOGGER.info(ethic)
+    LOGGER.debug("ethic is %s", ethic)
     if ethic:
         parse_status, ethics = parse_ethics(ethic)
     if ethic and parse_status is not True:
@@ -158,12 +157,12 @@ def set_ethics(article, article_id):
 
 
 def set_datasets(article, article_id):
-    LOGGER.info("in set_datasets")
+    LOGGER.debug("in set_datasets")
     datasets = data.get_datasets(article_id)
     dataset_objects = None
     data_availability = None
     parse_status = None
-    LOGGER.info(datasets)
+    LOGGER.debug("datasets is %s", datasets)
     if datasets:
         parse_status, dataset_objects, data_availability = parse_datasets(datasets)
     if datasets and parse_status is not True:
@@ -178,7 +177,7 @@ def set_datasets(article, article_id):
 
 
 def set_categories(article, article_id):
-    LOGGER.info("in set_categories")
+    LOGGER.debug("in set_categories")
     categories = data.get_subjects(article_id)
     if categories:
         for category in categories:
@@ -187,7 +186,7 @@ def set_categories(article, article_id):
 
 
 def set_organsims(article, article_id):
-    LOGGER.info("in set_organsims")
+    LOGGER.debug("in set_organsims")
     research_organisms = data.get_organisms(article_id)
     if research_organisms:
         for research_organism in research_organisms:
@@ -199,7 +198,7 @@ def set_organsims(article, article_id):
 
 
 def set_keywords(article, article_id):
-    LOGGER.info("in set_keywords")
+    LOGGER.debug("in set_keywords")
     keywords = data.get_keywords(article_id)
     if keywords:
         for keyword in keywords:
@@ -256,7 +255,7 @@ def set_author_info(article, article_id):
     for both authors and group authors,
     Then add the contributors to the article object in order of their position
     """
-    LOGGER.info("in set_author_info")
+    LOGGER.debug("in set_author_info")
     authors_dict = {}
 
     # check there are any authors before continuing
@@ -314,7 +313,7 @@ def set_author_info(article, article_id):
 
 
 def set_editor_info(article, article_id):
-    LOGGER.info("in set_editor_info")
+    LOGGER.debug("in set_editor_info")
 
     author_type = "editor"
 
@@ -334,11 +333,15 @@ def set_editor_info(article, article_id):
     editor = ea.Contributor(author_type, last_name, first_name)
     if suffix and suffix.strip() != "":
         editor.suffix = suffix
-    LOGGER.info("editor is: %s", str(editor))
-    LOGGER.info("getting ed id for article %s", article_id)
-    LOGGER.info("editor id is %s", data.get_me_id(article_id))
-    LOGGER.info(str(type(data.get_me_id(article_id))))
     editor.auth_id = data.get_me_id(article_id)
+    LOGGER.debug(
+        StructuredMessage(
+            "set_editor_info",
+            article_id=article_id,
+            editor=editor,
+            editor_id=editor.auth_id,
+        )
+    )
     affiliation = ea.Affiliation()
     department = data.get_me_department(article_id)
     if department.strip() != "":
@@ -359,7 +362,7 @@ def set_funding(article, article_id):
     Add principal award recipients in the order of author position for the article
     Finally add the funding objects to the article in the order of funding position
     """
-    LOGGER.info("in set_funding")
+    LOGGER.debug("in set_funding")
     if not article:
         return False
 
@@ -399,11 +402,8 @@ def set_funding(article, article_id):
                     funding_awards[funder_position].add_award(award_object)
 
     # Second pass, add the primary award recipients in article author order
-    for position in sorted(funding_awards.keys()):
-        for contrib in article.contributors:
-            for (funder_article_id, author_id, funder_position) in funder_ids:
-                if position == funder_position and contrib.auth_id == author_id:
-                    funding_awards[position].add_principal_award_recipient(contrib)
+    if funder_ids:
+        add_principal_award_recipients(funding_awards, article.contributors, funder_ids)
 
     # Add funding awards to the article object, sorted by position
     for position in sorted(funding_awards.keys()):
@@ -411,6 +411,29 @@ def set_funding(article, article_id):
     return True
 
 
+def add_principal_award_recipients(funding_awards, contributors, funder_ids):
+    """
+    Add the contributors who are recipients of each funding award as principal
+    award recipients, in the order of the contributors list
+    """
+    # Author ids of the recipients at each funder position
+    position_author_ids = defaultdict(set)
+    for (funder_article_id, author_id, funder_position) in funder_ids:
+        position_author_ids[funder_position].add(author_id)
+
+    # Contributors and their index in the list, keyed on their auth_id
+    contributor_index = defaultdict(list)
+    for index, contrib in enumerate(contributors):
+        contributor_index[contrib.auth_id].append((index, contrib))
+
+    for position in sorted(funding_awards.keys()):
+        recipients = []
+        for author_id in position_author_ids.get(position, ()):
+            recipients += contributor_index.get(author_id, [])
+        for index, contrib in sorted(recipients, key=lambda recipient: recipient[0]):
+            funding_awards[position].add_principal_award_recipient(contrib)
+
+
 def parse_ethics(ethic):
     """
     Given angle bracket escaped XML string, parse
@@ -424,27 +447,26 @@ def parse_ethics(ethic):
     parse_status = None
 
     # Decode escaped angle brackets
-    LOGGER.info("ethic is %s", ethic)
+    LOGGER.debug("ethic is %s", ethic)
     ethic_xml = utils.unserialise_angle_brackets(ethic)
     ethic_xml = etoolsutils.escape_ampersand(ethic_xml)
-    LOGGER.info("ethic is %s", ethic_xml)
+    LOGGER.debug("ethic is %s", ethic_xml)
 
     # Parse XML
     try:
-        reparsed = minidom.parseString(ethic_xml)
+        reparsed = ElementTree.fromstring(ethic_xml)
         parse_status = True
-    except ExpatError:
+    except ElementTree.ParseError:
         parse_status = False
         LOGGER.info("ethic reparsed is %s", reparsed)
 
     # Extract comments
-    if reparsed:
+    if reparsed is not None:
         for ethic_type in "animal_subjects", "human_subjects":
-            ethic_node = reparsed.getElementsByTagName(ethic_type)[0]
-            for node in ethic_node.childNodes:
-                if node.nodeName == "involved_comments":
-                    text_node = node.childNodes[0]
-                    ethic_text = text_node.nodeValue
+            ethic_node = list(reparsed.iter(ethic_type))[0]
+            for node in ethic_node:
+                if node.tag == "involved_comments":
+                    ethic_text = node.text
 
                     # Add boilerplate
                     if ethic_type == "animal_subjects":
@@ -459,34 +481,29 @@ def parse_ethics(ethic):
 
 
 def parse_dataset_node(dataset_node, dataset_type):
-    "extract attributes from a minidom node and populate a Dataset object"
+    "extract attributes from an ElementTree element and populate a Dataset object"
     dataset = ea.Dataset()
 
     dataset.dataset_type = dataset_type
 
-    for node in dataset_node.childNodes:
+    for node in dataset_node:
 
-        if node.nodeName == "authors_text_list" and node.childNodes:
-            text_node = node.childNodes[0]
-            for author_name in text_node.nodeValue.split(","):
+        if node.tag == "authors_text_list" and node.text:
+            for author_name in node.text.split(","):
                 if author_name.strip() != "":
                     dataset.add_author(author_name.lstrip())
 
-        if node.nodeName == "title":
-            text_node = node.childNodes[0]
-            dataset.title = utils.entity_to_unicode(text_node.nodeValue)
+        if node.tag == "title":
+            dataset.title = utils.entity_to_unicode(node.text)
 
-        if node.nodeName == "id":
-            text_node = node.childNodes[0]
-            dataset.source_id = utils.entity_to_unicode(text_node.nodeValue)
+        if node.tag == "id":
+            dataset.source_id = utils.entity_to_unicode(node.text)
 
-        if node.nodeName == "license_info":
-            text_node = node.childNodes[0]
-            dataset.license_info = utils.entity_to_unicode(text_node.nodeValue)
+        if node.tag == "license_info":
+            dataset.license_info = utils.entity_to_unicode(node.text)
 
-        if node.nodeName == "year" and node.childNodes:
-            text_node = node.childNodes[0]
-            dataset.year = utils.entity_to_unicode(text_node.nodeValue)
+        if node.tag == "year" and node.text:
+            dataset.year = utils.entity_to_unicode(node.text)
 
     return dataset
 
@@ -501,36 +518,31 @@ def parse_datasets(datasets_content):
     parse_status = None
 
     # Decode escaped angle brackets
-    LOGGER.info("datasets is %s", datasets_content)
+    LOGGER.debug("datasets is %s", datasets_content)
     datasets_xml = utils.escape_angle_brackets(datasets_content)
     datasets_xml = utils.unserialise_angle_brackets(datasets_xml)
     datasets_xml = etoolsutils.escape_ampersand(datasets_xml)
-    LOGGER.info("datasets is %s", datasets_xml)
+    LOGGER.debug("datasets is %s", datasets_xml)
 
     # Parse XML
     try:
-        reparsed = minidom.parseString(datasets_xml)
+        reparsed = ElementTree.fromstring(datasets_xml)
         parse_status = True
-    except ExpatError:
+    except ElementTree.ParseError:
         LOGGER.info("datasets reparsed is %s", reparsed)
         parse_status = False
 
     # Extract comments
-    if reparsed:
+    if reparsed is not None:
         for dataset_type in "datasets", "prev_published_datasets":
-            datasets_nodes = reparsed.getElementsByTagName(dataset_type)[0]
-            for dataset_node in datasets_nodes.getElementsByTagName("dataset"):
+            datasets_nodes = list(reparsed.iter(dataset_type))[0]
+            for dataset_node in datasets_nodes.iter("dataset"):
                 datasets.append(parse_dataset_node(dataset_node, dataset_type))
 
         # Parse the data availability statement
-        if reparsed.getElementsByTagName("data_availability_textbox"):
-            data_availability_node = reparsed.getElementsByTagName(
-                "data_availability_textbox"
-            )
-            if data_availability_node[0].childNodes:
-                data_availability = utils.entity_to_unicode(
-                    data_availability_node[0].childNodes[0].nodeValue
-                )
+        data_availability_node = next(reparsed.iter("data_availability_textbox"), None)
+        if data_availability_node is not None:
+            data_availability = utils.entity_to_unicode(data_availability_node.text)
 
     return parse_status, datasets, data_availability
 
@@ -584,7 +596,10 @@ def build_article(article_id):
     # Only happy with string article_id - cast it now to be safe!
     article_id = str(article_id)
 
-    article = instantiate_article(article_id)
+    # Pick up any changes to the CSV files if auto reloading is enabled
+    data.auto_reload_tables()
+
+    article = profiling.timed_call("instantiate_article", instantiate_article, article_id)
 
     # Run each of the below functions to build the article object components
     article_set_functions = [
@@ -603,7 +618,9 @@ def build_article(article_id):
         set_funding,
     ]
     for set_function in article_set_functions:
-        if not set_function(article, article_id):
+        if not profiling.timed_call(
+            set_function.__name__, set_function, article, article_id
+        ):
             error_count = error_count + 1
             error_messages.append(
                 "article_id " + str(article_id) + " error in " + set_function.__name__
@@ -613,7 +630,7 @@ def build_article(article_id):
     if article:
         article.is_poa = True
 
-    print(error_count)
+    LOGGER.info("article_id %s built with %s errors", article_id, error_count)
 
     # default conflict text
     if article:
@@ -625,3 +642,50 @@ def build_article(article_id):
         return article, error_count, error_messages
 
     return None, error_count, error_messages
+
+
+def build_articles(article_ids):
+    """
+    Given a list of article_id values, load and index the CSV tables once
+    then build each article in turn, yielding the same
+    (article, error_count, error_messages) tuple as build_article
+    """
+    data.index_tables()
+    for article_id in article_ids:
+        yield build_article(article_id)
+
+
+def build_articles_merged(article_ids=None):
+    """
+    Build the articles from CSV files which are each ordered by manuscript
+    number, reading the tables together one article at a time so only the
+    rows of that article are in memory, yielding the same
+    (article, error_count, error_messages) tuple as build_article in
+    manuscript number order, for each of article_ids if specified,
+    otherwise for each article in the manuscript table
+    """
+    if article_ids is not None:
+        article_ids = set(str(article_id) for article_id in article_ids)
+    export = data.article_bundle_export()
+    for article_id, bundle in data.iter_article_bundles():
+        if article_ids is None:
+            if len(bundle["manuscript"]) <= data.get_setting("DATA_START_ROW"):
+                continue
+        elif article_id not in article_ids:
+            continue
+        export.load_article_bundle(bundle)
+        yield export.build_article(article_id)
+
+
+def build_articles_parallel(article_ids, workers=None, chunksize=1):
+    """
+    Given a list of article_id values, load and index the CSV tables once
+    then build the articles in a pool of worker processes, yielding the
+    results in the same order as article_ids.
+    The workers share the loaded tables when processes are started by fork,
+    otherwise each worker loads the tables it uses.
+    """
+    data.index_tables()
+    with data.get_process_context().Pool(workers) as pool:
+        for result in pool.imap(build_article, article_ids, chunksize):
+            yield result
@@ -0,0 +1,96 @@
+"""
+Opt-in timing of the article building stages and the table loads,
+the wall time and call count of each are added up until reset()
+
+    profiling.enable()
+    list(parse.build_articles(article_ids))
+    print(profiling.report_text())
+
+Timings are kept per process, so stages run in build_articles_parallel()
+workers are not included
+"""
+import contextlib
+import json
+import time
+from collections import OrderedDict
+from ejpcsvparser import settings
+
+
+ENABLED = settings.PROFILING
+
+# name of each timed stage mapped to a list of its call count and total seconds
+STATS = OrderedDict()
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    "discard the timings recorded so far"
+    STATS.clear()
+
+
+def record(name, seconds):
+    "add a call taking seconds to the timings of the named stage"
+    stat = STATS.get(name)
+    if stat is None:
+        stat = STATS[name] = [0, 0.0]
+    stat[0] += 1
+    stat[1] += seconds
+
+
+@contextlib.contextmanager
+def timer(name):
+    "time the block as a call of the named stage, if profiling is enabled"
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed_call(name, function, *args):
+    "call the function, timing it as the named stage if profiling is enabled"
+    if not ENABLED:
+        return function(*args)
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def report():
+    "calls, total and mean seconds of each stage, keyed on the stage name"
+    stats = OrderedDict()
+    for name, (calls, seconds) in STATS.items():
+        stats[name] = OrderedDict(
+            [("calls", calls), ("seconds", seconds), ("mean", seconds / calls)]
+        )
+    return stats
+
+
+def report_json(indent=None):
+    return json.dumps(report(), indent=indent)
+
+
+def report_text():
+    "table of the timings with the slowest stages first"
+    stats = sorted(report().items(), key=lambda item: item[1]["seconds"], reverse=True)
+    lines = ["%-32s %8s %12s %12s" % ("stage", "calls", "total ms", "mean ms")]
+    for name, stat in stats:
+        lines.append(
+            "%-32s %8d %12.3f %12.3f"
+            % (name, stat["calls"], stat["seconds"] * 1000, stat["mean"] * 1000)
+        )
+    return "\n".join(lines)
@@ -8,6 +8,70 @@ CSV_PATH = "tests/test_data/"
 
 TMP_DIR = "tests/tmp/"
 
+# zip or tar archive holding the CSV files, as a path or a seekable binary file
+# object, to read the CSV files from instead of CSV_PATH without extracting it.
+# Threads take turns to read the CSV files of a file object, each CSV file is
+# parsed as it is read unless PARSED_CACHE_DIR is set, and the tables of a tar
+# archive are loaded in one pass through it by index_tables()
+CSV_ARCHIVE = None
+
+# write a copy of each cleaned CSV file to TMP_DIR, for debugging only
+CLEAN_CSV_TO_TMP_DIR = False
+
+# when set, check at most every AUTO_RELOAD_INTERVAL seconds whether the CSV files
+# have changed and reload the changed tables, None to keep tables until cleared
+AUTO_RELOAD_INTERVAL = None
+
+# also compare a checksum of the CSV file contents when checking for changes
+TABLE_SIGNATURE_CHECKSUM = False
+
+# folder to keep parsed tables in between processes, keyed on a checksum of
+# each CSV file, None to parse the CSV files in each new process
+PARSED_CACHE_DIR = None
+
+# number of the most recently used cache files of each table to keep in
+# PARSED_CACHE_DIR, so exports sharing the folder keep their own cache files
+PARSED_CACHE_KEEP = 3
+
+# maximum number of article attribute lookups to keep cached
+ATTRIBUTE_CACHE_SIZE = 100000
+
+# keep each table read through article attributes as one list per column,
+# grouped by article, instead of as rows indexed on article id, for fast whole
+# column scans with get_column(). The authors and funding tables, which are
+# indexed by their rows, and MMAP_TABLES are still kept as rows
+COLUMNAR_TABLES = False
+
+# tables to read from a memory map of their cleaned CSV file, written to
+# TMP_DIR, instead of keeping every cell in memory, each cell is decoded when
+# it is read, for example ["authors", "abstract"] for very large exports
+MMAP_TABLES = []
+
+# record the time taken by each article building stage and table load,
+# see ejpcsvparser.profiling
+PROFILING = False
+
+# columns whose values repeat across many rows, each distinct value of these
+# columns is kept only once in memory when a table is loaded
+INTERNED_COLUMNS = [
+    "poa_m_ms_id",
+    "poa_m_ms_no",
+    "poa_m_type",
+    "poa_a_type_cde",
+    "poa_a_dual_corr",
+    "poa_a_organization",
+    "poa_a_department",
+    "poa_a_city",
+    "poa_a_state",
+    "poa_a_country",
+    "poa_funder_order",
+    "poa_funder",
+    "poa_fund_ref_id",
+    "poa_l_license_id",
+    "poa_s_subjectarea",
+    "poa_ro_researchorganism",
+]
+
 CSV_FILES = {
     "authors": "poa_author.csv",
     "license": "poa_license.csv",
@@ -24,8 +88,9 @@ CSV_FILES = {
     "ethics": "poa_ethics.csv",
 }
 
-# Special files that allow quotation marks in their final column: column 3
-OVERFLOW_CSV_FILES = ["abstract", "title", "ethics", "datasets"]
+# Special files that allow quotation marks in their final column,
+# with the position of the final column, where commas do not delimit cells
+OVERFLOW_CSV_FILES = {"abstract": 2, "title": 2, "ethics": 3, "datasets": 3}
 
 CSV_COLUMN_HEADINGS = {
     "author_position": "poa_a_seq",
@@ -67,6 +67,45 @@ def article_type_indexes():
     return article_type_index
 
 
+# Selected character replacements that have been seen, keyed on entity name
+ENTITY_REPLACEMENTS = OrderedDict(
+    [
+        ("alpha", "\u03b1"),
+        ("beta", "\u03b2"),
+        ("gamma", "\u03b3"),
+        ("delta", "\u03b4"),
+        ("epsilon", "\u03b5"),
+        ("ordm", "\u00ba"),
+        ("iuml", "\u00cf"),
+        ("ldquo", '"'),
+        ("rdquo", '"'),
+    ]
+)
+
+
+def compile_entity_pattern():
+    "one regular expression matching numeric entities and the named entities"
+    names = "|".join(re.escape(name) for name in ENTITY_REPLACEMENTS)
+    return re.compile(r"&(?:#x(....)|(" + names + r"));")
+
+
+ENTITY_PATTERN = compile_entity_pattern()
+
+
+def add_entity_replacement(name, replacement):
+    "add a named entity to be converted by entity_to_unicode"
+    global ENTITY_PATTERN
+    ENTITY_REPLACEMENTS[name] = replacement
+    ENTITY_PATTERN = compile_entity_pattern()
+
+
+def entity_replacement(match):
+    "unicode character for a matched numeric or named entity"
+    if match.group(1) is not None:
+        return eautils.repl(match)
+    return ENTITY_REPLACEMENTS[match.group(2)]
+
+
 def entity_to_unicode(string):
     """
     Quick convert unicode HTML entities to unicode characters
@@ -74,24 +113,9 @@ def entity_to_unicode(string):
     """
     if not string:
         return string
-    # Selected character replacements that have been seen
-    replacements = []
-    replacements.append((r"&alpha;", "\u03b1"))
-    replacements.append((r"&beta;", "\u03b2"))
-    replacements.append((r"&gamma;", "\u03b3"))
-    replacements.append((r"&delta;", "\u03b4"))
-    replacements.append((r"&epsilon;", "\u03b5"))
-    replacements.append((r"&ordm;", "\u00ba"))
-    replacements.append((r"&iuml;", "\u00cf"))
-    replacements.append((r"&ldquo;", '"'))
-    replacements.append((r"&rdquo;", '"'))
-
-    # First, replace numeric entities with unicode
-    string = re.sub(r"&#x(....);", eautils.repl, string)
-    # Second, replace some specific entities specified in the list
-    for entity, replacement in replacements:
-        string = re.sub(entity, replacement, string)
-    return string
+    if "&" not in string:
+        return string
+    return ENTITY_PATTERN.sub(entity_replacement, string)
 
 
 def entities(function):
@@ -123,20 +147,25 @@ def unserialise_angle_brackets(escaped_string):
     return unserial_xml
 
 
+# tags in the CSV data renamed to their JATS XML tag names
+TAG_RENAMES = (("i", "italic"), ("u", "underline"), ("b", "bold"), ("em", "italic"))
+
+ALLOWED_TAGS = allowed_tags()
+
+
 def convert_to_xml_string(string):
     """
     For input strings with escaped tags and special characters
     issue a set of conversion functions to prepare it prior
-    to adding it to an article object
+    to adding it to an article object, skipping the tag conversions
+    when there are no angle brackets once the string is decoded
     """
-    string = entity_to_unicode(string)
-    string = decode_brackets(string)
-    string = eautils.replace_tags(string, "i", "italic")
-    string = eautils.replace_tags(string, "u", "underline")
-    string = eautils.replace_tags(string, "b", "bold")
-    string = eautils.replace_tags(string, "em", "italic")
-    string = etoolsutils.escape_unmatched_angle_brackets(string, allowed_tags())
-    return string
+    string = decode_brackets(entity_to_unicode(string))
+    if "<" not in string and ">" not in string:
+        return string
+    for from_tag, to_tag in TAG_RENAMES:
+        string = eautils.replace_tags(string, from_tag, to_tag)
+    return etoolsutils.escape_unmatched_angle_brackets(string, ALLOWED_TAGS)
 
 
 def escape_angle_brackets(string):
@@ -18,6 +18,7 @@ setup(
         "GitPython",
         "configparser",
     ],
+    entry_points={"console_scripts": ["ejpcsvparser=ejpcsvparser.cli:main"]},
     url="https://github.com/elifesciences/ejp-csv-parser",
     maintainer="eLife Sciences Publications Ltd.",
     maintainer_email="tech-team@elifesciences.org",
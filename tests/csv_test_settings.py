@@ -22,8 +22,9 @@ CSV_FILES = {
     "ethics": "poa_ethics.csv",
 }
 
-# Special files that allow quotation marks in their final column: column 3
-OVERFLOW_CSV_FILES = ["abstract", "title", "ethics", "datasets"]
+# Special files that allow quotation marks in their final column,
+# with the position of the final column, where commas do not delimit cells
+OVERFLOW_CSV_FILES = {"abstract": 2, "title": 2, "ethics": 3, "datasets": 3}
 
 CSV_COLUMN_HEADINGS = {
     "author_position": "poa_a_seq",
@@ -0,0 +1,94 @@
+import unittest
+import threading
+from ejpcsvparser import cache
+from ejpcsvparser import csv_data as data
+
+
+class TestMemoize(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        @cache.memoize
+        def square(number):
+            self.calls.append(number)
+            return number * number
+
+        self.square = square
+
+    def test_memoize(self):
+        self.assertEqual(self.square(3), 9)
+        self.assertEqual(self.square(3), 9)
+        self.assertEqual(self.calls, [3])
+        self.assertTrue((3,) in self.square)
+        self.assertEqual(self.square.hits, 1)
+        self.assertEqual(self.square.misses, 1)
+
+    def test_memoize_maxsize(self):
+        @cache.memoize(maxsize=2)
+        def double(number):
+            self.calls.append(number)
+            return number * 2
+
+        double(1)
+        double(2)
+        # use 1 again so 2 is the least recently used
+        double(1)
+        double(3)
+        self.assertEqual(list(double.keys()), [(1,), (3,)])
+        double(2)
+        self.assertEqual(self.calls, [1, 2, 3, 2])
+
+    def test_clear_table(self):
+        @cache.memoize(table=1)
+        def cell(article_id, table_type):
+            return (article_id, table_type)
+
+        @cache.memoize(table="authors")
+        def authors():
+            return []
+
+        cell("3", "authors")
+        cell("3", "funding")
+        authors()
+        cache.clear_caches("authors")
+        self.assertEqual(list(cell.keys()), [("3", "funding")])
+        self.assertEqual(len(authors), 0)
+        self.assertEqual(cell.misses, 2)
+
+    def test_clear_caches(self):
+        self.square(2)
+        self.square(2)
+        cache.clear_caches()
+        self.assertEqual(len(self.square), 0)
+        self.assertEqual(self.square.hits, 0)
+        self.assertEqual(self.square.misses, 0)
+
+    def test_cache_info(self):
+        @cache.memoize
+        def cube(number):
+            return number ** 3
+
+        cube(2)
+        cube(2)
+        data.get_csv_sheet("license")
+        info = cache.cache_info()
+        self.assertEqual(
+            dict(info["tests.test_cache.cube"]),
+            {"hits": 1, "misses": 1, "size": 1, "maxsize": None},
+        )
+        self.assertTrue(info["ejpcsvparser.csv_data.get_csv_sheet"]["size"] > 0)
+
+    def test_swap_entries_per_thread(self):
+        self.square(2)
+
+        def swapped_square():
+            cache.swap_entries({})
+            return (2,) in self.square, self.square(3)
+
+        thread_result = []
+        thread = threading.Thread(target=lambda: thread_result.append(swapped_square()))
+        thread.start()
+        thread.join()
+        self.assertEqual(thread_result, [(False, 9)])
+        # the entries of this thread are not changed
+        self.assertEqual(list(self.square.keys()), [(2,)])
@@ -0,0 +1,105 @@
+import unittest
+import json
+import os
+import time
+import zipfile
+from collections import OrderedDict
+from mock import patch
+from ejpcsvparser import cli
+from ejpcsvparser import csv_data as data
+
+
+class TestToDict(unittest.TestCase):
+    def test_to_dict(self):
+        class Node(object):
+            def __init__(self):
+                self.name = "node"
+                self._private = True
+                self.date = time.strptime("2017-01-31", "%Y-%m-%d")
+                self.children = (1, None)
+                self.parent = self
+
+        expected = OrderedDict(
+            [
+                ("name", "node"),
+                ("date", "2017-01-31"),
+                ("children", [1, None]),
+                ("parent", None),
+            ]
+        )
+        self.assertEqual(cli.to_dict(Node()), expected)
+        self.assertEqual(cli.to_dict({1: [Node()]}), {"1": [expected]})
+
+
+class TestBuild(unittest.TestCase):
+    def setUp(self):
+        self.output_path = "tests/tmp/articles.jsonl"
+        self.errors_path = "tests/tmp/errors.jsonl"
+        self.archive_path = "tests/tmp/export.zip"
+        self.csv_path = data.CSV_PATH
+
+    def tearDown(self):
+        data.clear_table_caches()
+        for path in [self.output_path, self.errors_path, self.archive_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def read_lines(self, path):
+        with open(path, "r") as open_file:
+            return [json.loads(line) for line in open_file]
+
+    @patch("sys.stderr")
+    def test_build(self, fake_stderr):
+        argv = [
+            "build",
+            "--csv-dir",
+            "tests/tmp/../test_data",
+            "--ids",
+            "21598",
+            "99999",
+            "12717",
+            "--output",
+            self.output_path,
+            "--errors",
+            self.errors_path,
+        ]
+        self.assertEqual(cli.main(argv), 1)
+        # the settings of the module are not changed
+        self.assertEqual(data.CSV_PATH, self.csv_path)
+        self.assertIs(data.get_active_export(), data.DEFAULT_EXPORT)
+        articles = self.read_lines(self.output_path)
+        self.assertEqual(
+            [article["doi"] for article in articles],
+            ["10.7554/eLife.21598", "10.7554/eLife.12717"],
+        )
+        self.assertEqual(articles[0]["dates"]["received"]["date"], "2016-09-19")
+        self.assertEqual(articles[0]["contributors"][0]["surname"], "Sobti")
+        errors = self.read_lines(self.errors_path)
+        self.assertEqual([error["article_id"] for error in errors], ["99999"])
+        self.assertGreater(errors[0]["error_count"], 0)
+        summary = "".join(call[0][0] for call in fake_stderr.write.call_args_list)
+        self.assertTrue("built 3 articles, 1 with errors" in summary)
+        self.assertTrue("peak RSS" in summary)
+
+    @patch("sys.stderr")
+    def test_build_jobs(self, fake_stderr):
+        argv = ["build", "--ids", "21598", "12717", "--jobs", "2"]
+        argv += ["--output", self.output_path]
+        self.assertEqual(cli.main(argv), 0)
+        articles = self.read_lines(self.output_path)
+        self.assertEqual(len(articles), 2)
+        self.assertEqual(articles[1]["doi"], "10.7554/eLife.12717")
+
+    @patch("sys.stderr")
+    def test_build_archive(self, fake_stderr):
+        with zipfile.ZipFile(self.archive_path, "w") as zip_file:
+            for file_name in data.CSV_FILES.values():
+                zip_file.write(os.path.join("tests/test_data", file_name), file_name)
+        data.clear_table_caches()
+        argv = ["build", "--archive", self.archive_path, "--ids", "21598"]
+        argv += ["--output", self.output_path]
+        self.assertEqual(cli.main(argv), 0)
+        self.assertIsNone(data.CSV_ARCHIVE)
+        self.assertEqual(
+            self.read_lines(self.output_path)[0]["doi"], "10.7554/eLife.21598"
+        )
@@ -1,8 +1,18 @@
 import unittest
+import concurrent.futures
+import csv
+import gc
+import io
 import os
+import re
+import shutil
+import sys
+import tarfile
+import weakref
+import zipfile
 from six.moves import reload_module
 from mock import patch
-from ejpcsvparser import configure_logging
+from ejpcsvparser import configure_logging, StructuredMessage
 from ejpcsvparser import csv_data as data
 
 from tests import csv_test_settings
@@ -84,6 +94,21 @@ class TestCleanCsv(TestCsvData):
                 ),
             )
 
+    def test_iter_flatten_lines(self):
+        "test records are yielded one at a time and can be read by csv.reader"
+        iterable = [
+            '"header"\n',
+            '"1","a\n',
+            "   b\n",
+            "\n",
+            'c"\n',
+            '"2","d"\n',
+        ]
+        records = data.iter_flatten_lines(iterable, 1)
+        self.assertEqual(next(records), '"header"\n')
+        self.assertEqual(next(records), '"1","ab c"\n')
+        self.assertEqual(list(csv.reader(records)), [["2", "d"]])
+
     def test_clean_csv(self):
         "test clean_csv using file read and writes"
         clean_csv_passes = []
@@ -111,6 +136,536 @@ class TestCleanCsv(TestCsvData):
             )
 
 
+class TestParseCsvRecords(TestCsvData):
+    def test_split_overflow_record(self):
+        record = '"15","7","A "quoted", title, with commas"\r\n'
+        expected = ["15", "7", 'A "quoted", title, with commas']
+        self.assertEqual(data.split_overflow_record(record, 2), expected)
+
+    def test_parse_csv_records(self):
+        records = [
+            '"Query: POA Title"\n',
+            '"Generated on May 14, 2014"\n',
+            "\n",
+            '"poa_m_ms_id","poa_m_ms_no","poa_m_title_tag"\n',
+            '"15","7","A "quoted", title"\n',
+        ]
+        expected = [
+            ["Query: POA Title"],
+            ["Generated on May 14, 2014"],
+            [],
+            ["poa_m_ms_id", "poa_m_ms_no", "poa_m_title_tag"],
+            ["15", "7", 'A "quoted", title'],
+        ]
+        self.assertEqual(data.parse_csv_records(records, "title"), expected)
+        # not an overflow file
+        expected[-1] = ["15", "7", 'A quoted"', ' title"']
+        self.assertEqual(data.parse_csv_records(records, "keywords"), expected)
+
+
+class TestGetCsvSheet(TestCsvData):
+    def setUp(self):
+        super(TestGetCsvSheet, self).setUp()
+        self.tmp_path = os.path.join(data.TMP_DIR, data.CSV_FILES["title"])
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def tearDown(self):
+        data.CLEAN_CSV_TO_TMP_DIR = False
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def test_get_csv_sheet_in_memory(self):
+        reload_module(data)
+        sheet = data.get_csv_sheet("title")
+        self.assertEqual(len(sheet), 14)
+        self.assertFalse(os.path.exists(self.tmp_path))
+
+    def test_get_csv_sheet_write_tmp_file(self):
+        reload_module(data)
+        data.CLEAN_CSV_TO_TMP_DIR = True
+        sheet = data.get_csv_sheet("title")
+        self.assertEqual(len(sheet), 14)
+        self.assertTrue(os.path.exists(self.tmp_path))
+
+    def test_get_csv_sheet_row_records(self):
+        reload_module(data)
+        row = data.get_csv_data_rows("authors")[0]
+        self.assertIsInstance(row, tuple)
+        self.assertEqual(type(row).__name__, "AuthorsRow")
+        self.assertEqual(row.poa_a_last_nm, "Schuman")
+        self.assertEqual(row[data.get_col_position("authors", "poa_a_last_nm")], "Schuman")
+
+    def test_get_csv_sheet_interned_columns(self):
+        reload_module(data)
+        rows = data.get_csv_data_rows("authors")
+        self.assertEqual(rows[0].poa_a_country, rows[1].poa_a_country)
+        self.assertIs(rows[0].poa_a_country, rows[1].poa_a_country)
+        # without interning each cell is a separate string
+        data.clear_table_caches("authors")
+        data.INTERNED_COLUMNS = []
+        try:
+            rows = data.get_csv_data_rows("authors")
+        finally:
+            data.INTERNED_COLUMNS = data.settings.INTERNED_COLUMNS
+            data.clear_table_caches("authors")
+        self.assertEqual(rows[0].poa_a_country, rows[1].poa_a_country)
+        self.assertIsNot(rows[0].poa_a_country, rows[1].poa_a_country)
+
+    def test_make_row_record(self):
+        row_class = data.get_row_class("group_authors", ("poa_m_ms_no", "poa_group_name"))
+        self.assertEqual(row_class.__name__, "GroupAuthorsRow")
+        # the record classes are shared by every export
+        with data.CsvExport():
+            self.assertIs(
+                data.get_row_class("group_authors", ("poa_m_ms_no", "poa_group_name")),
+                row_class,
+            )
+        self.assertEqual(data.make_row_record(row_class, ["7"]), ("7", None))
+        self.assertEqual(data.make_row_record(row_class, ["7", "a", "b"]), ("7", "a"))
+
+
+class TestTableCaches(TestCsvData):
+    def setUp(self):
+        super(TestTableCaches, self).setUp()
+        self.csv_path = "tests/tmp/export/"
+        os.makedirs(self.csv_path, exist_ok=True)
+        for table_type in ["license", "keywords"]:
+            file_name = data.CSV_FILES[table_type]
+            shutil.copy(os.path.join("tests/test_data", file_name), self.csv_path)
+        data.clear_table_caches()
+        data.CSV_PATH = self.csv_path
+
+    def tearDown(self):
+        data.clear_table_caches()
+        shutil.rmtree(self.csv_path)
+        override_settings()
+        data.AUTO_RELOAD_INTERVAL = None
+        data.TABLE_SIGNATURE_CHECKSUM = False
+        data.LAST_RELOAD_CHECK = None
+
+    def change_license(self, license_id):
+        "rewrite the license file so article 3 has a different license_id"
+        license_path = data.get_csv_path("license")
+        with open(license_path, "r") as open_file:
+            content = open_file.read()
+        with open(license_path, "w") as open_file:
+            open_file.write(
+                re.sub(r'"17","3","\d"', '"17","3","%s"' % license_id, content)
+            )
+        # set a different modified time each change
+        os.utime(license_path, ns=(license_id, license_id))
+
+    def test_get_table_signature(self):
+        self.assertIsNotNone(data.get_table_signature("license"))
+        self.assertIsNone(data.get_table_signature("authors"))
+
+    def test_invalidate_stale_tables(self):
+        self.assertEqual(data.get_license("3"), "1")
+        self.assertEqual(len(data.get_keywords("3")), 4)
+        self.assertEqual(data.invalidate_stale_tables(), [])
+        self.change_license(2)
+        self.assertEqual(data.invalidate_stale_tables(), ["license"])
+        self.assertTrue(("keywords",) in data.get_csv_sheet)
+        self.assertFalse(("license",) in data.get_csv_sheet)
+        self.assertEqual(data.get_license("3"), "2")
+
+    def test_get_table_signature_checksum(self):
+        data.TABLE_SIGNATURE_CHECKSUM = True
+        signature = data.get_table_signature("license")
+        self.assertEqual(len(signature), 3)
+        self.assertEqual(len(signature[2]), 40)
+
+    def test_reload_changed_tables(self):
+        self.assertEqual(data.get_license("3"), "1")
+        self.assertEqual(len(data.get_keywords("3")), 4)
+        keywords_index = data.index_table_on_article_id("keywords")
+        self.change_license(2)
+        self.assertEqual(data.reload_changed_tables(), ["license"])
+        # the changed table is loaded again and the other is left alone
+        self.assertTrue(("license",) in data.index_table_on_article_id)
+        self.assertIs(data.index_table_on_article_id("keywords"), keywords_index)
+        self.assertEqual(data.get_license("3"), "2")
+        # a removed file is cleared but cannot be loaded
+        os.remove(data.get_csv_path("license"))
+        self.assertEqual(data.reload_changed_tables(), ["license"])
+        self.assertFalse(("license",) in data.index_table_on_article_id)
+
+    def test_auto_reload_tables(self):
+        self.assertEqual(data.get_license("3"), "1")
+        self.change_license(2)
+        # not enabled
+        self.assertEqual(data.auto_reload_tables(), [])
+        self.assertEqual(data.get_license("3"), "1")
+        data.AUTO_RELOAD_INTERVAL = 3600
+        self.assertEqual(data.auto_reload_tables(), ["license"])
+        self.assertEqual(data.get_license("3"), "2")
+        # checked too recently to check again
+        self.change_license(3)
+        self.assertEqual(data.auto_reload_tables(), [])
+        data.AUTO_RELOAD_INTERVAL = 0
+        self.assertEqual(data.auto_reload_tables(), ["license"])
+        self.assertEqual(data.get_license("3"), "3")
+
+
+class TestParsedCache(TestCsvData):
+    def setUp(self):
+        super(TestParsedCache, self).setUp()
+        self.cache_dir = "tests/tmp/parsed_cache"
+        data.clear_table_caches()
+        data.PARSED_CACHE_DIR = self.cache_dir
+
+    def tearDown(self):
+        data.PARSED_CACHE_DIR = None
+        override_settings()
+        data.clear_table_caches()
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+
+    def test_get_parsed_cache_path(self):
+        cache_path = data.get_parsed_cache_path("license")
+        self.assertTrue(cache_path.startswith("tests/tmp/parsed_cache/license-"))
+        self.assertTrue(cache_path.endswith(".pickle"))
+        data.PARSED_CACHE_DIR = None
+        self.assertIsNone(data.get_parsed_cache_path("license"))
+
+    def test_get_csv_sheet_parsed_cache(self):
+        sheet = data.get_csv_sheet("license")
+        self.assertTrue(os.path.exists(data.get_parsed_cache_path("license")))
+        data.clear_table_caches()
+        with patch("ejpcsvparser.csv_data.parse_csv_records") as fake_parse:
+            self.assertEqual(data.get_csv_sheet("license"), sheet)
+            self.assertEqual(fake_parse.call_count, 0)
+        # different settings do not use the same cache file
+        data.DATA_START_ROW = 5
+        self.assertFalse(os.path.exists(data.get_parsed_cache_path("license")))
+
+    def test_read_parsed_cache_bad_file(self):
+        cache_path = data.get_parsed_cache_path("license")
+        self.assertIsNone(data.read_parsed_cache(cache_path))
+        os.makedirs(self.cache_dir)
+        with open(cache_path, "wb") as open_file:
+            open_file.write(b"not a pickle")
+        self.assertIsNone(data.read_parsed_cache(cache_path))
+        # the table is parsed and the cache file is replaced
+        self.assertEqual(len(data.get_csv_sheet("license")), 14)
+        self.assertIsNotNone(data.read_parsed_cache(cache_path))
+
+    def test_old_cache_files_removed(self):
+        os.makedirs(self.cache_dir)
+        names = [
+            "license-0000.pickle",
+            "license-0001.pickle",
+            "license-0002.pickle",
+            "license_type-0000.pickle",
+            "title-0000.pickle",
+        ]
+        for seconds, name in enumerate(names):
+            path = os.path.join(self.cache_dir, name)
+            with open(path, "wb") as open_file:
+                open_file.write(b"old")
+            os.utime(path, (seconds, seconds))
+        data.get_csv_sheet("license")
+        cache_name = os.path.basename(data.get_parsed_cache_path("license"))
+        # the most recently used files of the table are kept
+        self.assertEqual(
+            sorted(os.listdir(self.cache_dir)),
+            sorted(
+                [
+                    cache_name,
+                    "license-0001.pickle",
+                    "license-0002.pickle",
+                    "license_type-0000.pickle",
+                    "title-0000.pickle",
+                ]
+            ),
+        )
+
+    def test_cache_files_shared_by_exports(self):
+        "exports sharing the folder do not remove each other's cache files"
+        other_path = "tests/tmp/other/"
+        os.makedirs(other_path)
+        try:
+            shutil.copy(data.get_csv_path("license"), other_path)
+            other_csv = os.path.join(other_path, data.CSV_FILES["license"])
+            with open(other_csv, "a") as open_file:
+                open_file.write("\n")
+            other_export = data.CsvExport(csv_path=other_path)
+            data.get_csv_sheet("license")
+            other_export.get_csv_sheet("license")
+            for export in [data.DEFAULT_EXPORT, other_export]:
+                with export:
+                    cache_path = data.get_parsed_cache_path("license")
+                self.assertTrue(os.path.exists(cache_path))
+        finally:
+            shutil.rmtree(other_path)
+
+
+class TestCsvExport(TestCsvData):
+    def setUp(self):
+        super(TestCsvExport, self).setUp()
+        self.csv_path = "tests/tmp/export_b/"
+        os.makedirs(self.csv_path, exist_ok=True)
+        license_path = os.path.join(self.csv_path, data.CSV_FILES["license"])
+        with open(os.path.join("tests/test_data", data.CSV_FILES["license"])) as open_file:
+            content = open_file.read()
+        with open(license_path, "w") as open_file:
+            open_file.write(content.replace('"17","3","1"', '"17","3","2"'))
+        data.clear_table_caches()
+
+    def tearDown(self):
+        data.clear_table_caches()
+        shutil.rmtree(self.csv_path)
+
+    def test_exports_side_by_side(self):
+        export_a = data.CsvExport()
+        export_b = data.CsvExport(csv_path=self.csv_path)
+        self.assertEqual(export_a.get_license("3"), "1")
+        self.assertEqual(export_b.get_license("3"), "2")
+        self.assertEqual(export_a.get_license("3"), "1")
+        with export_b:
+            self.assertIs(data.get_active_export(), export_b)
+            self.assertEqual(data.get_setting("CSV_PATH"), self.csv_path)
+            self.assertEqual(data.CSV_PATH, "tests/test_data/")
+            self.assertEqual(data.get_license("3"), "2")
+            self.assertTrue("license" in data.get_setting("TABLE_SIGNATURES"))
+        # the default export has not loaded any tables
+        self.assertIs(data.get_active_export(), data.DEFAULT_EXPORT)
+        self.assertFalse(("license",) in data.get_csv_sheet)
+        self.assertEqual(data.TABLE_SIGNATURES, {})
+        self.assertEqual(data.get_license("3"), "1")
+
+    def test_module_globals_kept(self):
+        "settings changed on the module stay with the default export"
+        data.CSV_PATH = self.csv_path
+        with data.CsvExport(csv_path="tests/test_data/"):
+            self.assertEqual(data.get_license("3"), "1")
+        self.assertEqual(data.CSV_PATH, self.csv_path)
+        self.assertEqual(data.get_license("3"), "2")
+
+    def test_build_articles(self):
+        export = data.CsvExport(csv_path="tests/test_data/")
+        results = list(export.build_articles([21598, 99999]))
+        self.assertEqual(results[0][0].doi, "10.7554/eLife.21598")
+        self.assertIsNone(results[1][0])
+        self.assertFalse(("manuscript",) in data.get_csv_sheet)
+
+    def test_export_garbage_collected(self):
+        export = data.CsvExport(csv_path=self.csv_path)
+        self.assertEqual(export.get_license("3"), "2")
+        export_ref = weakref.ref(export)
+        del export
+        gc.collect()
+        self.assertIsNone(export_ref())
+
+    def test_unknown_setting(self):
+        with self.assertRaises(TypeError):
+            data.CsvExport(csv_folder=self.csv_path)
+
+    def test_export_per_thread(self):
+        "activating an export does not change the export other threads use"
+        with data.CsvExport(csv_path=self.csv_path):
+            self.assertEqual(data.get_license("3"), "2")
+            with concurrent.futures.ThreadPoolExecutor(1) as executor:
+                self.assertEqual(executor.submit(data.get_license, "3").result(), "1")
+        self.assertEqual(data.get_license("3"), "1")
+
+    def test_export_data_start_row(self):
+        with data.CsvExport(data_start_row=0):
+            self.assertEqual(data.flatten_lines(['"a\n', "   b\n", '"\n']), '"ab"\n')
+        self.assertEqual(
+            data.flatten_lines(['"a\n', "   b\n", '"\n']), '"a\n   b\n"\n'
+        )
+
+    def test_settings_copied(self):
+        export = data.CsvExport(mmap_tables=[])
+        self.assertEqual(export.values["CSV_FILES"], data.CSV_FILES)
+        self.assertIsNot(export.values["CSV_FILES"], data.CSV_FILES)
+        with export:
+            data.get_setting("CSV_FILES")["license"] = "missing.csv"
+            data.get_setting("MMAP_TABLES").append("license")
+        self.assertEqual(data.CSV_FILES["license"], "poa_license.csv")
+        self.assertEqual(data.MMAP_TABLES, [])
+
+    def test_exports_in_threads(self):
+        exports = [data.CsvExport(), data.CsvExport(csv_path=self.csv_path)]
+
+        def get_license(index):
+            with exports[index % 2]:
+                # load the table again, so other threads have time to switch exports
+                data.clear_table_caches("license")
+                return data.get_license("3")
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(8) as executor:
+                licenses = list(executor.map(get_license, range(200)))
+        finally:
+            sys.setswitchinterval(switch_interval)
+        self.assertEqual(licenses, ["1", "2"] * 100)
+        self.assertIs(data.get_active_export(), data.DEFAULT_EXPORT)
+
+
+class TestCsvArchive(TestCsvData):
+    def setUp(self):
+        super(TestCsvArchive, self).setUp()
+        self.zip_path = "tests/tmp/export.zip"
+        self.tar_path = "tests/tmp/export.tar.gz"
+        file_names = sorted(data.CSV_FILES.values())
+        with zipfile.ZipFile(self.zip_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for file_name in file_names:
+                zip_file.write(os.path.join("tests/test_data", file_name), file_name)
+        with tarfile.open(self.tar_path, "w:gz") as tar_file:
+            for file_name in file_names:
+                tar_file.add(
+                    os.path.join("tests/test_data", file_name), "export/" + file_name
+                )
+        data.clear_table_caches()
+        self.expected = [
+            data.read_csv_sheet(table_type) for table_type in ["authors", "title"]
+        ]
+
+    def tearDown(self):
+        data.CSV_ARCHIVE = None
+        data.clear_table_caches()
+        for path in [self.zip_path, self.tar_path]:
+            os.remove(path)
+
+    def read_sheets(self, archive):
+        data.CSV_ARCHIVE = archive
+        return [data.read_csv_sheet(table_type) for table_type in ["authors", "title"]]
+
+    def test_read_zip(self):
+        self.assertEqual(self.read_sheets(self.zip_path), self.expected)
+        self.assertIsNotNone(data.get_table_signature("authors"))
+        self.assertEqual(
+            data.get_csv_location("title"), "tests/tmp/export.zip:poa_title.csv"
+        )
+
+    def test_read_tar(self):
+        self.assertEqual(self.read_sheets(self.tar_path), self.expected)
+
+    def test_read_file_objects(self):
+        for path in [self.zip_path, self.tar_path]:
+            with open(path, "rb") as open_file:
+                archive = io.BytesIO(open_file.read())
+            self.assertEqual(self.read_sheets(archive), self.expected)
+            self.assertIsNone(data.get_table_signature("authors"))
+
+    def test_archive_views(self):
+        archive = io.BytesIO(b"0123456789")
+        first, second = data.ArchiveView(archive), data.ArchiveView(archive)
+        self.assertEqual(first.read(4), b"0123")
+        self.assertEqual(second.read(2), b"01")
+        self.assertEqual(first.read(), b"456789")
+        second.seek(-3, io.SEEK_END)
+        self.assertEqual(second.read(), b"789")
+
+    def test_read_member_streamed(self):
+        data.CLEAN_CSV_TO_TMP_DIR = True
+        try:
+            with patch.object(data, "read_csv_content") as read_csv_content:
+                self.assertEqual(self.read_sheets(self.tar_path), self.expected)
+            read_csv_content.assert_not_called()
+            with open("tests/tmp/poa_title.csv") as open_file:
+                debug_copy = open_file.read()
+            data.CSV_ARCHIVE = None
+            with open(data.clean_csv(data.get_csv_path("title"))) as open_file:
+                self.assertEqual(debug_copy, open_file.read())
+        finally:
+            data.CLEAN_CSV_TO_TMP_DIR = False
+            for file_name in ["poa_author.csv", "poa_title.csv"]:
+                os.remove(os.path.join("tests/tmp", file_name))
+
+    def test_read_file_object_threads(self):
+        table_types = list(data.CSV_FILES.keys())
+        expected = [data.read_csv_sheet(table_type) for table_type in table_types]
+        with open(self.tar_path, "rb") as open_file:
+            data.CSV_ARCHIVE = io.BytesIO(open_file.read())
+        for _ in range(3):
+            with concurrent.futures.ThreadPoolExecutor(8) as executor:
+                sheets = list(executor.map(data.read_csv_sheet, table_types))
+            self.assertEqual(sheets, expected)
+            data.clear_table_caches()
+            data.preload_tables(workers=8)
+            self.assertEqual(
+                [data.get_csv_data_rows(table_type) for table_type in table_types],
+                [
+                    data.sheet_records(table_type, sheet)[data.DATA_START_ROW:]
+                    for table_type, sheet in zip(table_types, expected)
+                ],
+            )
+            data.clear_table_caches()
+
+    def test_load_tar_in_one_pass(self):
+        data.CSV_ARCHIVE = self.tar_path
+        data.PARSED_CACHE_DIR = "tests/tmp/parsed_cache"
+        try:
+            with patch("tarfile.open", wraps=tarfile.open) as tar_open:
+                data.index_tables()
+            self.assertEqual(tar_open.call_count, 1)
+        finally:
+            data.PARSED_CACHE_DIR = None
+            shutil.rmtree("tests/tmp/parsed_cache")
+        self.assertEqual(data.get_csv_sheet.misses, 0)
+        self.assertEqual(
+            list(data.get_csv_data_rows("title")),
+            data.sheet_records("title", self.expected[1])[data.DATA_START_ROW:],
+        )
+        self.assertIsNotNone(data.TABLE_SIGNATURES.get("authors"))
+
+    def test_missing_member(self):
+        data.CSV_ARCHIVE = self.zip_path
+        data.CSV_FILES = dict(data.CSV_FILES, authors="missing.csv")
+        with self.assertRaises(FileNotFoundError):
+            data.read_csv_sheet("authors")
+
+    def test_export_archive(self):
+        export = data.CsvExport(csv_archive=self.tar_path)
+        article, error_count, _ = export.build_article(21598)
+        self.assertEqual(error_count, 0)
+        self.assertEqual(article.doi, "10.7554/eLife.21598")
+
+
+class TestMappedTables(TestCsvData):
+    def setUp(self):
+        super(TestMappedTables, self).setUp()
+        data.clear_table_caches()
+
+    def tearDown(self):
+        data.MMAP_TABLES = []
+        data.clear_table_caches()
+
+    def test_read_mapped_sheet(self):
+        for table_type in ["authors", "title", "datasets"]:
+            expected = data.sheet_records(table_type, data.read_csv_sheet(table_type))
+            sheet = data.read_mapped_sheet(table_type)
+            self.assertEqual(len(sheet), len(expected))
+            for row, expected_row in zip(sheet, expected):
+                self.assertEqual(list(row), list(expected_row))
+
+    def test_mapped_row(self):
+        data.MMAP_TABLES = ["authors"]
+        row = data.get_csv_data_rows("authors")[0]
+        self.assertIsInstance(row, data.MappedRow)
+        self.assertEqual(len(row), len(data.get_csv_col_names("authors")))
+        self.assertEqual(data.get_table_cell_value("authors", "poa_a_last_nm", row), "Schuman")
+        self.assertEqual(row, data.read_mapped_sheet("authors")[data.DATA_START_ROW])
+        self.assertEqual(data.get_author_last_name("7", "1399"), "Schuman")
+        # no temporary files are left behind
+        self.assertEqual(
+            [name for name in os.listdir(data.TMP_DIR) if name.startswith("authors-")], []
+        )
+
+    def test_mapped_preload(self):
+        data.MMAP_TABLES = ["authors"]
+        load_times = data.preload_tables(["license", "authors"], workers=2)
+        self.assertEqual(list(load_times.keys()), ["license", "authors"])
+        self.assertIsInstance(data.get_csv_data_rows("authors")[0], data.MappedRow)
+        self.assertEqual(len(data.index_table_on_article_id("authors")["7"]), 3)
+
+
 class TestIndexing(TestCsvData):
     def setUp(self):
         # configure logging
@@ -137,10 +692,49 @@ class TestIndexing(TestCsvData):
         self.assertEqual(data.get_csv_col_names(table_type), expected)
         # check for log file contents
         with open(self.log_filename, "r", encoding="utf-8") as open_file:
-            self.assertTrue(
-                "INFO ejpcsvparser:csv_data:get_csv_sheet: tests/test_data/poa_license.csv"
-                in open_file.read()
-            )
+            log_content = open_file.read()
+        self.assertTrue(
+            "INFO ejpcsvparser:csv_data:get_csv_sheet: tests/test_data/poa_license.csv"
+            in log_content
+        )
+        # the rows of the sheet are not logged
+        self.assertFalse("poa_l_license_dt" in log_content)
+
+    def test_structured_message(self):
+        message = StructuredMessage("get_article_attributes", label="x", article_id=3)
+        self.assertEqual(
+            str(message), "get_article_attributes article_id=3 label=x"
+        )
+        data.get_article_attributes.value("3", "title", "poa_m_title_tag")
+        with open(self.log_filename, "r", encoding="utf-8") as open_file:
+            self.assertFalse("get_article_attributes" in open_file.read())
+
+    def test_get_csv_col_positions(self):
+        table_type = "license"
+        expected = {
+            "poa_m_ms_id": 0,
+            "poa_m_ms_no": 1,
+            "poa_l_license_id": 2,
+            "poa_l_license_dt": 3,
+        }
+        self.assertEqual(data.get_csv_col_positions(table_type), expected)
+        self.assertEqual(data.COL_POSITIONS[table_type], expected)
+        # the positions are read again with the table
+        data.clear_table_caches(table_type)
+        self.assertFalse(table_type in data.COL_POSITIONS)
+
+    def test_get_col_position(self):
+        self.assertEqual(data.get_col_position("authors", "poa_a_last_nm"), 6)
+        with self.assertRaises(ValueError):
+            data.get_col_position("authors", "not_a_column")
+
+    def test_get_table_cell_value(self):
+        row = ["15", "7", "1", "2012-06-21 05:17:14.820"]
+        self.assertEqual(data.get_table_cell_value("license", "poa_m_ms_no", row), "7")
+        self.assertEqual(
+            data.get_table_cell_value("license", "poa_l_license_dt", row[:3]), None
+        )
+        self.assertEqual(data.get_table_cell_value("license", "poa_m_ms_no", []), None)
 
     def test_get_csv_data_rows(self):
         table_type = "authors"
@@ -168,6 +762,93 @@ class TestIndexing(TestCsvData):
         article_author_index = data.index_authors_on_author_id()
         self.assertEqual(len(article_author_index), expected_row_count)
 
+    def test_index_tables(self):
+        # reload module first to avoid memoize remembering data from other test scenarios
+        reload_module(data)
+        data.index_tables(["license", "funding"])
+        self.assertTrue(("license",) in data.index_table_on_article_id)
+        self.assertTrue(("funding",) in data.index_table_on_article_id)
+        self.assertFalse(("authors",) in data.index_table_on_article_id)
+        self.assertTrue(() in data.index_funding_table)
+        self.assertFalse(() in data.index_authors_on_author_id)
+
+    def test_preload_tables(self):
+        data.clear_table_caches()
+        load_times = data.preload_tables(["license", "authors", "funding"], workers=3)
+        self.assertEqual(list(load_times.keys()), ["license", "authors", "funding"])
+        self.assertTrue(all(seconds >= 0 for seconds in load_times.values()))
+        self.assertTrue(("license",) in data.index_table_on_article_id)
+        self.assertTrue(() in data.index_authors_on_author_id)
+        self.assertTrue(() in data.index_funding_table)
+        with open(self.log_filename, "r", encoding="utf-8") as open_file:
+            self.assertTrue("loaded 3 tables in " in open_file.read())
+
+    def test_get_table_columns(self):
+        columns, offsets = data.get_table_columns("keywords")
+        self.assertEqual(
+            list(columns.keys()), ["poa_m_ms_id", "poa_m_ms_no", "poa_kw_keyword"]
+        )
+        self.assertEqual(offsets["7"], (0, 6))
+        article_ids = columns["poa_m_ms_no"]
+        self.assertEqual(len(article_ids), len(data.get_csv_data_rows("keywords")))
+        for article_id, (start, stop) in offsets.items():
+            self.assertEqual(set(article_ids[start:stop]), {article_id})
+
+    def test_get_column(self):
+        self.assertEqual(
+            data.get_column("keywords", "poa_kw_keyword", 7)[:2],
+            ["GLV (green leaf volatile)", "HIPV (herbivory-induced plant volatile)"],
+        )
+        self.assertEqual(data.get_column("keywords", "poa_kw_keyword", 99999), [])
+        self.assertEqual(
+            len(data.get_column("keywords", "poa_m_ms_id")),
+            len(data.get_csv_data_rows("keywords")),
+        )
+        with self.assertRaises(ValueError):
+            data.get_column("keywords", "not_a_column")
+
+    def test_get_article_attributes_columnar(self):
+        lookups = [
+            ("keywords", "poa_kw_keyword"),
+            ("authors", "poa_a_last_nm"),
+            ("title", "poa_m_title_tag"),
+        ]
+        for attribute_type, attribute_label in lookups:
+            for article_id in list(data.index_table_on_article_id(attribute_type)):
+                expected = data.get_article_attributes.value(
+                    article_id, attribute_type, attribute_label
+                )
+                data.COLUMNAR_TABLES = True
+                try:
+                    columnar = data.get_article_attributes.value(
+                        article_id, attribute_type, attribute_label
+                    )
+                finally:
+                    data.COLUMNAR_TABLES = False
+                self.assertEqual(columnar, expected)
+
+
+    def test_index_columnar_tables(self):
+        data.clear_table_caches()
+        data.COLUMNAR_TABLES = True
+        try:
+            data.index_tables(["keywords", "authors"])
+            # the keywords are kept only as columns
+            self.assertTrue(("keywords",) in data.get_table_columns)
+            self.assertFalse(("keywords",) in data.index_table_on_article_id)
+            self.assertFalse(("keywords",) in data.get_csv_sheet)
+            self.assertFalse(("keywords",) in data.get_csv_data_rows)
+            self.assertEqual(
+                data.get_article_attributes("7", "keywords", "poa_kw_keyword")[:2],
+                ["GLV (green leaf volatile)", "HIPV (herbivory-induced plant volatile)"],
+            )
+            self.assertFalse(("keywords",) in data.get_csv_sheet)
+            # the authors are kept as rows for the author indexes
+            self.assertFalse(("authors",) in data.get_table_columns)
+            self.assertTrue(("authors",) in data.index_table_on_article_id)
+        finally:
+            data.COLUMNAR_TABLES = False
+            data.clear_table_caches()
 
 class TestArticleAttributes(TestCsvData):
     def test_get_article_attributes(self):
@@ -527,6 +1208,8 @@ class TestFunding(TestCsvData):
         article_id = "12717"
         expected = [("12717", "13727", "1"), ("12717", "13727", "2")]
         self.assertEqual(data.get_funding_ids(article_id), expected)
+        # article with no funding rows
+        self.assertEqual(data.get_funding_ids("3"), [])
 
     def test_get_funding_attribute(self):
         article_id = "21598"
@@ -1,8 +1,15 @@
 import unittest
+import io
+import json
+import os
+import shutil
+import tarfile
 import time
+from collections import OrderedDict
 from mock import patch
-from elifearticle.article import Article
-from ejpcsvparser import parse
+from elifearticle.article import Article, Contributor, FundingAward
+from ejpcsvparser import cli, parse
+from ejpcsvparser import csv_data as data
 
 
 def generate_date(date_string="2013-10-03", date_format="%Y-%m-%d"):
@@ -28,6 +35,40 @@ class TestParseArticle(unittest.TestCase):
         self.assertGreater(len(error_messages), 0)
         self.assertIsNone(article)
 
+    def test_build_articles(self):
+        "build a batch of articles in order"
+        article_ids = [21598, 99999, "12717"]
+        results = list(parse.build_articles(article_ids))
+        self.assertEqual(len(results), 3)
+        article, error_count, error_messages = results[0]
+        self.assertEqual(article.doi, "10.7554/eLife.21598")
+        self.assertEqual(error_count, 0)
+        self.assertEqual(error_messages, [])
+        article, error_count, error_messages = results[1]
+        self.assertIsNone(article)
+        self.assertGreater(error_count, 0)
+        article, error_count, error_messages = results[2]
+        self.assertEqual(article.doi, "10.7554/eLife.12717")
+        self.assertEqual(len(article.funding_awards), 2)
+
+    def test_build_articles_parallel(self):
+        "build articles in worker processes and get results in order"
+        article_ids = [21598, 99999, "12717", 2935]
+        results = list(parse.build_articles_parallel(article_ids, workers=2))
+        self.assertEqual(len(results), 4)
+        for result, expected in zip(results, parse.build_articles(article_ids)):
+            article, error_count, error_messages = result
+            expected_article, expected_error_count, expected_error_messages = expected
+            self.assertEqual(error_count, expected_error_count)
+            self.assertEqual(error_messages, expected_error_messages)
+            if expected_article:
+                self.assertEqual(article.doi, expected_article.doi)
+                self.assertEqual(
+                    len(article.contributors), len(expected_article.contributors)
+                )
+            else:
+                self.assertIsNone(article)
+
     def test_instantiate_article(self):
         article_id = 21598
         article = parse.instantiate_article(article_id)
@@ -52,6 +93,85 @@ class TestParseArticle(unittest.TestCase):
         )
 
 
+def write_sorted_csv(table_type, csv_path):
+    "write a copy of the fixture CSV file with its rows ordered by manuscript number"
+    sheet = data.read_csv_sheet(table_type)
+    position = sheet[data.ROWS_WITH_COLNAMES].index("poa_m_ms_no")
+    data_rows = sorted(sheet[data.DATA_START_ROW :], key=lambda row: int(row[position]))
+    with open(os.path.join(csv_path, data.CSV_FILES[table_type]), "w") as open_file:
+        for row in sheet[: data.DATA_START_ROW] + data_rows:
+            # quotation marks in the cells are written as they are, as EJP does
+            open_file.write(",".join('"%s"' % cell for cell in row) + "\n")
+
+
+class TestBuildArticlesMerged(unittest.TestCase):
+    def setUp(self):
+        self.csv_path = "tests/tmp/sorted/"
+        os.makedirs(self.csv_path, exist_ok=True)
+        for table_type in data.CSV_FILES:
+            write_sorted_csv(table_type, self.csv_path)
+        self.export = data.CsvExport(csv_path=self.csv_path)
+        data.clear_table_caches()
+
+    def tearDown(self):
+        shutil.rmtree(self.csv_path)
+
+    def test_iter_article_bundles(self):
+        with self.export:
+            bundles = list(data.iter_article_bundles(["license", "authors"]))
+        article_ids = [article_id for article_id, _ in bundles]
+        self.assertEqual(article_ids, sorted(article_ids, key=int))
+        article_id, bundle = bundles[0]
+        self.assertEqual(article_id, "3")
+        self.assertEqual(list(bundle.keys()), ["license", "authors"])
+        self.assertEqual(
+            bundle["license"][data.ROWS_WITH_COLNAMES][:2], ["poa_m_ms_id", "poa_m_ms_no"]
+        )
+        self.assertEqual(
+            bundle["license"][data.DATA_START_ROW :],
+            [["17", "3", "1", "2012-06-21 16:02:20.390"]],
+        )
+        self.assertEqual(len(bundle["authors"]), data.DATA_START_ROW + 12)
+
+    def test_build_articles_merged(self):
+        article_ids = list(self.export.index_table_on_article_id("manuscript").keys())
+        results = list(self.export.build_articles(sorted(article_ids, key=int)))
+        with self.export:
+            merged_results = list(parse.build_articles_merged())
+        self.assertEqual(len(merged_results), len(article_ids))
+        for result, expected in zip(merged_results, results):
+            self.assertEqual(result[1:], expected[1:])
+            self.assertEqual(
+                json.dumps(cli.to_dict(result[0])), json.dumps(cli.to_dict(expected[0]))
+            )
+
+    def test_build_articles_merged_ids(self):
+        with self.export:
+            results = list(parse.build_articles_merged([21598, "99999", 7]))
+            # the tables are not loaded in full
+            self.assertFalse(("authors",) in data.get_csv_sheet)
+        self.assertEqual(
+            [article.doi for article, _, _ in results],
+            ["10.7554/eLife.00007", "10.7554/eLife.21598"],
+        )
+
+    def test_iter_article_bundles_file_object(self):
+        "the tables are read from one archive file object at the same time"
+        with self.export:
+            expected = list(data.iter_article_bundles())
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w:gz") as tar_file:
+            for file_name in data.CSV_FILES.values():
+                tar_file.add(os.path.join(self.csv_path, file_name), file_name)
+        with data.CsvExport(csv_archive=archive):
+            self.assertEqual(list(data.iter_article_bundles()), expected)
+
+    def test_unsorted(self):
+        "the fixture CSV files are not ordered by manuscript number"
+        with self.assertRaises(ValueError):
+            list(data.iter_article_bundles(["license"]))
+
+
 class TestParseDoi(unittest.TestCase):
     @patch("ejpcsvparser.csv_data.get_doi")
     def test_instantiate_article_no_doi(self, fake_get_doi):
@@ -569,6 +689,32 @@ class TestParseFunding(unittest.TestCase):
         self.assertEqual(award.principal_award_recipients[0].surname, "Solecki")
         self.assertEqual(award.principal_award_recipients[0].given_name, "David J")
 
+    def test_add_principal_award_recipients(self):
+        "recipients are added in contributor order to each award they receive"
+        contributors = []
+        for auth_id in ["3", "1", "2", None]:
+            contrib = Contributor("author", "Surname" + str(auth_id), "Given")
+            contrib.auth_id = auth_id
+            contributors.append(contrib)
+        funding_awards = OrderedDict([("1", FundingAward()), ("2", FundingAward())])
+        funder_ids = [
+            ("7", "1", "1"),
+            ("7", "2", "2"),
+            ("7", "3", "1"),
+            ("7", "4", "2"),
+        ]
+        parse.add_principal_award_recipients(funding_awards, contributors, funder_ids)
+        recipients = funding_awards["1"].principal_award_recipients
+        self.assertEqual(
+            [contrib.auth_id for contrib in recipients],
+            ["3", "1"],
+        )
+        recipients = funding_awards["2"].principal_award_recipients
+        self.assertEqual(
+            [contrib.auth_id for contrib in recipients],
+            ["2"],
+        )
+
     @patch("ejpcsvparser.csv_data.get_funding_ids")
     def test_set_funding_empty_data(self, fake_get_funding_ids):
         fake_get_funding_ids.return_value = None
@@ -0,0 +1,46 @@
+import unittest
+import json
+from ejpcsvparser import csv_data as data
+from ejpcsvparser import parse, profiling
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        profiling.reset()
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_disabled(self):
+        self.assertEqual(profiling.timed_call("double", lambda x: x * 2, 3), 6)
+        with profiling.timer("block"):
+            pass
+        self.assertEqual(profiling.report(), {})
+
+    def test_record(self):
+        profiling.enable()
+        self.assertEqual(profiling.timed_call("double", lambda x: x * 2, 3), 6)
+        profiling.record("double", 0.5)
+        with profiling.timer("block"):
+            pass
+        stats = profiling.report()
+        self.assertEqual(list(stats.keys()), ["double", "block"])
+        self.assertEqual(stats["double"]["calls"], 2)
+        self.assertGreaterEqual(stats["double"]["seconds"], 0.5)
+        self.assertEqual(stats["double"]["mean"], stats["double"]["seconds"] / 2)
+        self.assertEqual(json.loads(profiling.report_json())["block"]["calls"], 1)
+        lines = profiling.report_text().split("\n")
+        self.assertEqual(lines[0].split(), ["stage", "calls", "total", "ms", "mean", "ms"])
+        self.assertEqual(lines[1].split()[0], "double")
+
+    def test_build_article(self):
+        data.clear_table_caches("title")
+        profiling.enable()
+        parse.build_article(21598)
+        parse.build_article(12717)
+        stats = profiling.report()
+        self.assertEqual(stats["instantiate_article"]["calls"], 2)
+        self.assertEqual(stats["set_title"]["calls"], 2)
+        self.assertEqual(stats["set_funding"]["calls"], 2)
+        self.assertEqual(stats["load_table.title"]["calls"], 1)
@@ -1,7 +1,22 @@
 import unittest
+from elifearticle import utils as eautils
+from elifetools import utils as etoolsutils
+from ejpcsvparser import csv_data as data
 from ejpcsvparser import utils
 
 
+def convert_to_xml_string_stepwise(string):
+    "reference conversion applying each step to the whole string in turn"
+    string = utils.entity_to_unicode(string)
+    string = utils.decode_brackets(string)
+    string = eautils.replace_tags(string, "i", "italic")
+    string = eautils.replace_tags(string, "u", "underline")
+    string = eautils.replace_tags(string, "b", "bold")
+    string = eautils.replace_tags(string, "em", "italic")
+    string = etoolsutils.escape_unmatched_angle_brackets(string, utils.allowed_tags())
+    return string
+
+
 class TestUtils(unittest.TestCase):
     def test_allowed_tags(self):
         self.assertIsNotNone(utils.allowed_tags(), "allowed_tags not returned")
@@ -39,6 +54,60 @@ class TestUtils(unittest.TestCase):
         for string_input, string_output in passes:
             self.assertEqual(utils.entity_to_unicode(string_input), string_output)
 
+    def test_entity_to_unicode_single_pass(self):
+        "an entity created by decoding another entity is not decoded again"
+        self.assertEqual(utils.entity_to_unicode("&#x0026;alpha;"), "&alpha;")
+
+    def test_add_entity_replacement(self):
+        self.assertEqual(utils.entity_to_unicode("&kappa; &beta;"), "&kappa; \u03b2")
+        utils.add_entity_replacement("kappa", "\u03ba")
+        try:
+            self.assertEqual(utils.entity_to_unicode("&kappa; &beta;"), "\u03ba \u03b2")
+        finally:
+            del utils.ENTITY_REPLACEMENTS["kappa"]
+            utils.ENTITY_PATTERN = utils.compile_entity_pattern()
+
+    def test_convert_to_xml_string(self):
+        passes = []
+        passes.append(("", ""))
+        passes.append((None, "None"))
+        passes.append(
+            (
+                "LTLTiGTGTPINK1LTLT/iGTGT &amp; LTLTemGTGTparkinLTLT/emGTGT LTLT 20 GTGT 10",
+                "<italic>PINK1</italic> &amp; <italic>parkin</italic> &lt; 20 &gt; 10",
+            )
+        )
+        passes.append(
+            (
+                "a < b <i>c</i> <u>d</u> <b>e</b> <sup>2</sup> <x>y</x> >",
+                (
+                    "a &lt; b <italic>c</italic> <underline>d</underline> <bold>e</bold> "
+                    + "<sup>2</sup> &lt;x&gt;y&lt;/x&gt; &gt;"
+                ),
+            )
+        )
+        for string_input, string_output in passes:
+            self.assertEqual(utils.convert_to_xml_string(string_input), string_output)
+
+    def test_convert_to_xml_string_corpus(self):
+        "compare with converting in separate steps for the abstracts and titles"
+        corpus = [
+            "<<i>a</i>>",
+            "<i>unclosed <b>bold</b> and < <p> LTLT/iGTGT",
+            "&#x003C;i&#x003E;entity tags&#x003C;/i&#x003E; &alpha;GTGTLTLT",
+            "LTLTLTLTGTGTGTGT <em><u>></u></em> <sub>x</sub",
+        ]
+        for table_type in ["abstract", "title"]:
+            position = data.get_col_position(table_type, "poa_m_%s_tag" % table_type)
+            for row in data.get_csv_data_rows(table_type):
+                corpus.append(row[position])
+        for string in corpus:
+            self.assertEqual(
+                utils.convert_to_xml_string(string),
+                convert_to_xml_string_stepwise(string),
+                "%s does not convert the same" % string,
+            )
+
     def test_escape_angle_brackets(self):
         passes = []
         passes.append((None, None))